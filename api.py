@@ -0,0 +1,87 @@
+#client HTTP Alpha Vantage (session partagée, limite de débit, reprises)
+
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://www.alphavantage.co/query"
+
+
+class RateLimiter:
+    def __init__(self, calls_per_minute=5, burst=None):
+        """
+        Seau à jetons : calls_per_minute jetons par minute, au plus burst en réserve
+        """
+        self.rate = calls_per_minute / 60.0
+        self.capacity = burst or calls_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Bloque jusqu'à ce qu'un jeton soit disponible
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AlphaVantageClient:
+    def __init__(self, api_key, calls_per_minute=5, max_retries=4, backoff=5.0, pool_size=10):
+        """
+        Client partagé : une session keep-alive, un limiteur de débit et des reprises
+        quand l'API renvoie le message de limitation par minute "Note" (pas pour le quota quotidien)
+        """
+        self.api_key = api_key
+        self.limiter = RateLimiter(calls_per_minute) if calls_per_minute else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+
+    @staticmethod
+    def is_throttled(data):
+        """
+        Détecte la limitation par minute d'Alpha Vantage (message "Note"), levée en attendant
+        """
+        return isinstance(data, dict) and "Note" in data
+
+    @staticmethod
+    def is_quota_exhausted(data):
+        """
+        Détecte le quota quotidien épuisé (message "Information") : inutile de réessayer avant le lendemain
+        """
+        return isinstance(data, dict) and "rate limit" in data.get("Information", "").lower()
+
+    def query(self, **params):
+        """
+        Exécute une requête et retourne le JSON décodé (ou le texte brut en mode CSV)
+        """
+        params["apikey"] = self.api_key
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            response = self.session.get(BASE_URL, params=params, timeout=30)
+            # En mode CSV, seules les erreurs sont renvoyées en JSON
+            if params.get("datatype") == "csv" and not response.text.lstrip().startswith("{"):
+                return response.text
+            data = response.json()
+            if self.is_quota_exhausted(data):
+                print(f"❌ Quota quotidien Alpha Vantage épuisé ({params.get('symbol', '')}): {data['Information']}")
+                return data
+            if not self.is_throttled(data) or attempt == self.max_retries:
+                return data
+            wait = self.backoff * (2 ** attempt)
+            print(f"⏳ Limite API atteinte ({params.get('symbol', '')}), nouvel essai dans {wait:.0f}s...")
+            time.sleep(wait)
+        return data
@@ -3,78 +3,260 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from panel import Panel
+
+def trade_points(predictions, confidence, threshold=0.6, position=0):
+    """
+    Indices des achats et des ventes selon les règles du backtest, sans boucle sur les barres
+    Achat : prédiction 1 et confiance > threshold à plat ; vente : prédiction 0 et confiance > threshold en position
+    Ces deux signaux étant exclusifs, une transaction a lieu à chaque signal de sens opposé au précédent
+    position : 1 si une position est déjà ouverte au début des tableaux (la première transaction est une vente)
+    """
+    signal = np.zeros(len(predictions), dtype=np.int8)
+    strong = confidence > threshold
+    signal[strong & (predictions == 1)] = 1
+    signal[strong & (predictions == 0)] = -1
+    
+    events = np.flatnonzero(signal)
+    kinds = signal[events]
+    # Départ à plat : tout se passe comme si le dernier signal avait été une vente (un achat en position)
+    points = events[kinds != np.r_[np.int8(1 if position else -1), kinds[:-1]]]
+    if position:
+        return points[1::2], points[0::2]
+    return points[0::2], points[1::2]
+
+
+def trade_stats(trades):
+    """
+    Nombre d'achats et de ventes, PNL total et nombre de ventes gagnantes d'une liste de trades
+    """
+    pnls = [t['pnl'] for t in trades if t['action'] == 'SELL']
+    return {
+        'buy_trades': len(trades) - len(pnls),
+        'sell_trades': len(pnls),
+        'total_pnl': sum(pnls),
+        'wins': sum(1 for pnl in pnls if pnl > 0)
+    }
+
+
+def minmax_indices(values, n_buckets):
+    """
+    Indices à tracer pour garder la forme d'une série : premier et dernier point, minimum et maximum
+    de chaque tranche (n_buckets tranches de même taille), soit au plus 2 * n_buckets + 4 points
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if n <= 2 * n_buckets + 2:
+        return np.arange(n)
+    
+    size = n // n_buckets
+    used = size * n_buckets
+    blocks = values[:used].reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    indices = [[0, n - 1], offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)]
+    if used < n:
+        indices.append([used + values[used:].argmin(), used + values[used:].argmax()])
+    return np.unique(np.concatenate(indices))
+
+
+def marker_indices(dates, n_buckets):
+    """
+    Indices des marqueurs à tracer : le premier de chaque tranche de temps (n_buckets tranches
+    sur la période), tous si leur nombre ne dépasse pas n_buckets
+    """
+    if len(dates) <= n_buckets:
+        return np.arange(len(dates))
+    times = dates.asi8
+    span = times.max() - times.min() + 1
+    buckets = (times - times.min()) / span * n_buckets
+    return np.sort(np.unique(buckets.astype(np.int64), return_index=True)[1])
+
+
+def frame_chunks(features_df, chunksize=100_000):
+    """
+    Découpe features_df en blocs de chunksize lignes (vues sans copie) pour Backtester.run_streaming
+    Avec un Panel mappé en mémoire (panel.frame(symbole)), seules les pages du bloc courant sont lues
+    """
+    for start in range(0, len(features_df), chunksize):
+        yield features_df.iloc[start:start + chunksize]
+
 
 class Backtester:
     def __init__(self, initial_capital=10000):
         self.initial_capital = initial_capital
         self.results = None
+        self.panel_results = None
     
-    def run_backtest(self, features_df, strategy):
+    def run_backtest(self, features_df, strategy, engine="vectorized"):
         """
         Exécute un backtest de la stratégie
+        Avec un Panel, chaque symbole est testé séparément et un dict {symbole: résultats} est retourné
+        engine : "vectorized" ou "loop" (voir simulate)
         """
+        if isinstance(features_df, Panel):
+            self.panel_results = {
+                symbol: self.run_backtest(frame, strategy, engine)
+                for symbol, frame in features_df.frames(dropna=True).items()
+            }
+            return self.panel_results
+        
         if features_df is None or len(features_df) < 50:
             print("❌ Données insuffisantes pour le backtest")
             return None
         
-        df = features_df.copy().dropna()
-        
-        # Préparer les features
-        X, y, df_clean = strategy.prepare_features(df)
+        # Préparer les features (une DesignMatrix déjà construite est réutilisée telle quelle)
+        design = strategy.design_matrix(features_df)
         
-        if X is None or len(X) < 30:
+        if design is None or len(design) < 30:
             print("❌ Pas assez de données après préparation")
             return None
         
-        # Backtest simple
-        capital = self.initial_capital
-        position = 0  # 0: pas de position, 1: long
-        trades = []
-        portfolio_value = []
-        
         # Utiliser les prédictions du modèle
         try:
-            X_scaled = strategy.scaler.transform(X)
-            predictions = strategy.model.predict(X_scaled)
-            probabilities = strategy.model.predict_proba(X_scaled)
+            predictions, probabilities = strategy.predict(design)
         except Exception as e:
             print(f"❌ Erreur lors des prédictions: {e}")
             return None
         
+        self.results = self.simulate(design.close, design.index, predictions, probabilities.max(axis=1),
+                                     engine=engine)
+        return self.results
+    
+    def run_streaming(self, chunks, strategy=None, keep_trades=False):
+        """
+        Backtest en flux, en mémoire constante quelle que soit la longueur de l'historique
+        chunks : itérable de DataFrames de features (prédits bloc par bloc avec strategy, voir frame_chunks)
+        ou de tuples (clôtures, dates, prédictions, confiances)
+        Seuls la position et des accumulateurs passent d'un bloc à l'autre : Welford pour le Sharpe,
+        pic courant pour le drawdown, compteurs de trades. Mêmes résultats que run_backtest sur les mêmes
+        barres (Sharpe à l'arrondi près), sans la série de valeur du portefeuille
+        keep_trades : conserve la liste des trades (sa taille croît avec le nombre de transactions)
+        """
+        state = {'capital': self.initial_capital, 'position': 0, 'shares': 0, 'entry_price': 0}
+        stats = {'buy_trades': 0, 'sell_trades': 0, 'total_pnl': 0, 'wins': 0}
+        trades = []
+        final_value = self.initial_capital
+        last_value = None
+        peak = -np.inf
+        max_drawdown = 0
+        count, mean, m2 = 0, 0.0, 0.0
+        n_bars = 0
+        
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                close, index, predictions, confidence = chunk
+            else:
+                design = strategy.design_matrix(chunk, min_rows=0)
+                if design is None:
+                    return None
+                if len(design) == 0:
+                    continue
+                predictions, probabilities = strategy.predict(design)
+                close, index, confidence = design.close, design.index, probabilities.max(axis=1)
+            if len(close) == 0:
+                continue
+            
+            chunk_trades, values, final_value = self._simulate_vectorized(close, index, predictions, confidence,
+                                                                          state)
+            for key, value in trade_stats(chunk_trades).items():
+                stats[key] += value
+            if keep_trades:
+                trades.extend(chunk_trades)
+            
+            # Rendements du bloc (le premier se rapporte à la dernière valeur du bloc précédent)
+            values = np.asarray(values, dtype=np.float64)
+            previous = values[:-1] if last_value is None else np.r_[last_value, values[:-1]]
+            returns = values[len(values) - len(previous):] / previous - 1
+            last_value = values[-1]
+            n_bars += len(values)
+            
+            # Fusion de Welford par blocs (moyenne et somme des carrés des écarts)
+            if len(returns):
+                chunk_mean = returns.mean()
+                delta = chunk_mean - mean
+                total = count + len(returns)
+                mean += delta * len(returns) / total
+                m2 += ((returns - chunk_mean) ** 2).sum() + delta ** 2 * count * len(returns) / total
+                count = total
+            
+            # Drawdown par rapport au plus haut courant
+            peaks = np.maximum.accumulate(np.r_[peak, values])[1:]
+            peak = peaks[-1]
+            max_drawdown = min(max_drawdown, ((values - peaks) / peaks).min())
+        
+        std = np.sqrt(m2 / (count - 1)) if count > 1 else 0
+        sharpe_ratio = mean / std * np.sqrt(252) if std > 0 else 0
+        
+        self.results = {
+            'initial_capital': self.initial_capital,
+            'final_value': final_value,
+            'total_return': (final_value - self.initial_capital) / self.initial_capital,
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': max_drawdown,
+            'trades': trades,
+            'trade_stats': stats,
+            'bars': n_bars
+        }
+        return self.results
+    
+    def simulate(self, close, index, predictions, confidence, engine="vectorized"):
+        """
+        Applique les règles de trading à des tableaux de clôtures, prédictions et confiances
+        engine : "vectorized" (transitions calculées sur les tableaux, boucle sur les seules transactions)
+        ou "loop" (boucle de référence barre par barre) ; les deux donnent les mêmes trades et métriques
+        """
+        if engine == "vectorized":
+            trades, portfolio_value, final_value = self._simulate_vectorized(close, index, predictions, confidence)
+        elif engine == "loop":
+            trades, portfolio_value = self._simulate_loop(close, index, predictions, confidence)
+            final_value = portfolio_value[-1] if portfolio_value else self.initial_capital
+        else:
+            raise ValueError(f"Moteur de backtest inconnu: {engine}")
+        return self._metrics(trades, portfolio_value, final_value)
+    
+    def _simulate_loop(self, close, index, predictions, confidence):
+        """
+        Boucle barre par barre (référence du moteur vectorisé)
+        """
+        capital = self.initial_capital
+        position = 0  # 0: pas de position, 1: long
+        trades = []
+        portfolio_value = []
+        
         entry_price = 0
         shares = 0
         
-        for i in range(len(df_clean)):
-            current_price = df_clean['Close'].iloc[i]
+        for i in range(len(close)):
+            current_price = close[i]
             prediction = predictions[i]
-            confidence = probabilities[i].max()
             
             # Règles de trading
-            if position == 0 and prediction == 1 and confidence > 0.6:
+            if position == 0 and prediction == 1 and confidence[i] > 0.6:
                 # Achat
                 position = 1
                 entry_price = current_price
                 shares = capital / current_price
                 trades.append({
-                    'date': df_clean.index[i],
+                    'date': index[i],
                     'action': 'BUY',
                     'price': current_price,
                     'shares': shares,
-                    'confidence': confidence
+                    'confidence': confidence[i]
                 })
             
-            elif position == 1 and prediction == 0 and confidence > 0.6:
+            elif position == 1 and prediction == 0 and confidence[i] > 0.6:
                 # Vente
                 position = 0
                 exit_price = current_price
                 pnl = (exit_price - entry_price) * shares
                 capital = shares * exit_price
                 trades.append({
-                    'date': df_clean.index[i],
+                    'date': index[i],
                     'action': 'SELL',
                     'price': current_price,
                     'pnl': pnl,
-                    'confidence': confidence
+                    'confidence': confidence[i]
                 })
             
             # Valeur du portefeuille
@@ -83,8 +265,93 @@ class Backtester:
             else:
                 portfolio_value.append(capital)
         
-        # Calcul des métriques
-        final_value = portfolio_value[-1] if portfolio_value else self.initial_capital
+        return trades, portfolio_value
+    
+    def _simulate_vectorized(self, close, index, predictions, confidence, state=None):
+        """
+        Même simulation que _simulate_loop : les points d'achat et de vente sont calculés sur les tableaux,
+        puis seules les transactions sont parcourues pour enchaîner le capital
+        state : position reportée du bloc précédent (capital, position, shares, entry_price), mise à jour
+        en place à la fin du bloc (voir run_streaming)
+        Retourne (trades, valeur du portefeuille par barre, valeur finale)
+        """
+        position = state['position'] if state else 0
+        buys, sells = trade_points(predictions, confidence, position=position)
+        n = len(close)
+        
+        # Dates, prix et confiances des transactions extraits en une fois (l'accès scalaire à l'index est coûteux)
+        points = np.sort(np.concatenate([buys, sells]))
+        dates = dict(zip(points.tolist(), index[points]))
+        
+        # Position ouverte dans un bloc précédent : achat fictif avant la première barre
+        if position:
+            buys = np.r_[-1, buys]
+        
+        # Boucle sur les seules transactions : enchaînement du capital et liste des trades
+        capital = state['capital'] if state else self.initial_capital
+        final_value = capital
+        trades = []
+        capitals = [capital]
+        shares_held = []
+        for k, buy in enumerate(buys.tolist()):
+            if buy < 0:
+                entry_price, shares = state['entry_price'], state['shares']
+                shares_held.append(shares)
+            else:
+                entry_price = close[buy]
+                shares = capital / entry_price
+                shares_held.append(shares)
+                trades.append({
+                    'date': dates[buy],
+                    'action': 'BUY',
+                    'price': entry_price,
+                    'shares': shares,
+                    'confidence': confidence[buy]
+                })
+            if k < len(sells):
+                sell = int(sells[k])
+                exit_price = close[sell]
+                pnl = (exit_price - entry_price) * shares
+                capital = shares * exit_price
+                capitals.append(capital)
+                trades.append({
+                    'date': dates[sell],
+                    'action': 'SELL',
+                    'price': exit_price,
+                    'pnl': pnl,
+                    'confidence': confidence[sell]
+                })
+                final_value = capital
+            else:
+                final_value = shares * close[n - 1]
+        
+        # Valeur par barre : capital à plat, actions × clôture en position (mêmes opérations que la boucle)
+        # La boucle de référence construit la série à partir de scalaires : elle n'est en float32 que si
+        # les prix le sont et qu'un achat a lieu dès la première barre (aucune valeur n'est alors le capital initial)
+        dtype = close.dtype if close.dtype == np.float32 and len(buys) and buys[0] == 0 else np.float64
+        bars = np.arange(n)
+        trade_number = np.searchsorted(buys, bars, side='right') - 1
+        closed = np.searchsorted(sells, bars, side='right')
+        holding = trade_number >= closed
+        portfolio_value = np.empty(n, dtype=dtype)
+        portfolio_value[~holding] = np.asarray(capitals)[closed[~holding]]
+        if shares_held:
+            portfolio_value[holding] = np.asarray(shares_held)[trade_number[holding]] * close[holding]
+        
+        if n == 0:
+            final_value = self.initial_capital
+        if state is not None:
+            state['capital'] = capital
+            if len(buys) > len(sells):
+                state.update(position=1, shares=shares, entry_price=entry_price)
+            else:
+                state['position'] = 0
+        return trades, portfolio_value, final_value
+    
+    def _metrics(self, trades, portfolio_value, final_value):
+        """
+        Rendement, Sharpe et drawdown à partir de la valeur du portefeuille
+        """
         total_return = (final_value - self.initial_capital) / self.initial_capital
         
         # Métriques de performance
@@ -100,7 +367,7 @@ class Backtester:
         drawdown = (portfolio_series - rolling_max) / rolling_max
         max_drawdown = drawdown.min() if len(drawdown) > 0 else 0
         
-        self.results = {
+        return {
             'initial_capital': self.initial_capital,
             'final_value': final_value,
             'total_return': total_return,
@@ -110,13 +377,14 @@ class Backtester:
             'portfolio_value': portfolio_value,
             'returns': returns
         }
-        
-        return self.results
     
-    def print_results(self):
+    def print_results(self, symbol=None):
         """
-        Affiche les résultats du backtest
+        Affiche les résultats du backtest (symbol : résultat d'un backtest sur Panel)
         """
+        if symbol is not None:
+            self.results = (self.panel_results or {}).get(symbol)
+        
         if self.results is None:
             print("❌ Aucun résultat à afficher")
             return
@@ -130,62 +398,97 @@ class Backtester:
         print(f"🎯 Ratio de Sharpe: {self.results['sharpe_ratio']:.2f}")
         print(f"📉 Maximum Drawdown: {self.results['max_drawdown']:+.2%}")
         
-        buy_trades = [t for t in self.results['trades'] if t['action'] == 'BUY']
-        sell_trades = [t for t in self.results['trades'] if t['action'] == 'SELL']
+        # Backtest en flux : compteurs tenus pendant la simulation
+        stats = self.results.get('trade_stats') or trade_stats(self.results['trades'])
         
-        print(f"🛒 Trades d'achat: {len(buy_trades)}")
-        print(f"🏪 Trades de vente: {len(sell_trades)}")
+        print(f"🛒 Trades d'achat: {stats['buy_trades']}")
+        print(f"🏪 Trades de vente: {stats['sell_trades']}")
         
-        if sell_trades:
-            total_pnl = sum(t['pnl'] for t in sell_trades)
-            avg_pnl = total_pnl / len(sell_trades)
-            win_rate = len([t for t in sell_trades if t['pnl'] > 0]) / len(sell_trades)
+        if stats['sell_trades']:
+            total_pnl = stats['total_pnl']
+            avg_pnl = total_pnl / stats['sell_trades']
+            win_rate = stats['wins'] / stats['sell_trades']
             print(f"📊 PNL total: ${total_pnl:+.2f}")
             print(f"📊 PNL moyen: ${avg_pnl:+.2f}")
             print(f"🎯 Taux de réussite: {win_rate:.2%}")
         
         print("="*60)
     
-    def plot_results(self, features_df):
+    def plot_results(self, features_df, path=None, max_points=2000, dpi=100):
         """
-        Affiche un graphique des performances
+        Graphique des performances : valeur du portefeuille, drawdown, prix et signaux
+        path : écrit directement le graphique dans un fichier (PNG, SVG, PDF...) sans fenêtre ni pyplot
+        max_points : nombre de tranches min/max par courbe ; le coût du tracé ne dépend plus de la longueur
+        de l'historique, le pic et le creux du drawdown maximal et toutes les transactions restent visibles
         """
         if self.results is None:
             print("❌ Aucun résultat à afficher")
             return
         
-        plt.figure(figsize=(12, 10))
-        
-        # Prix et valeur du portefeuille
-        df_clean = features_df.dropna()
-        
-        plt.subplot(2, 1, 1)
-        if len(self.results['portfolio_value']) > 0:
-            dates = df_clean.index[:len(self.results['portfolio_value'])]
-            plt.plot(dates, self.results['portfolio_value'], label='Valeur du portefeuille', linewidth=2)
-            plt.title('Performance du Portefeuille', fontsize=14, fontweight='bold')
-            plt.ylabel('Valeur ($)', fontsize=12)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-        
-        plt.subplot(2, 1, 2)
-        plt.plot(df_clean.index, df_clean['Close'], label='Prix de clôture', linewidth=2)
-        
-        # Marquer les points d'achat/vente
-        buy_dates = [t['date'] for t in self.results['trades'] if t['action'] == 'BUY']
-        sell_dates = [t['date'] for t in self.results['trades'] if t['action'] == 'SELL']
-        buy_prices = [t['price'] for t in self.results['trades'] if t['action'] == 'BUY']
-        sell_prices = [t['price'] for t in self.results['trades'] if t['action'] == 'SELL']
-        
-        if buy_dates:
-            plt.scatter(buy_dates, buy_prices, color='green', marker='^', s=100, label='Achat', zorder=5)
-        if sell_dates:
-            plt.scatter(sell_dates, sell_prices, color='red', marker='v', s=100, label='Vente', zorder=5)
-        
-        plt.title('Prix et Signaux de Trading', fontsize=14, fontweight='bold')
-        plt.ylabel('Prix ($)', fontsize=12)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        if path is not None:
+            # Figure hors pyplot : rendu Agg, aucune fenêtre ni état global
+            # (mise en page contrainte : calculée pendant l'unique rendu, au lieu d'un rendu de plus pour tight_layout)
+            fig = Figure(figsize=(12, 12), layout='constrained')
+            self._draw(fig, features_df, max_points)
+            fig.savefig(path, dpi=dpi)
+            print(f"🖼️ Graphique enregistré: {path}")
+            return path
+        
+        fig = plt.figure(figsize=(12, 12), layout='constrained')
+        self._draw(fig, features_df, max_points)
+        plt.show()
+    
+    def _draw(self, fig, features_df, max_points):
+        """
+        Trace les trois panneaux sur fig à partir des séries réduites par minmax_indices
+        """
+        # Lignes complètes (comme features_df.dropna()) sans copier les features
+        valid = features_df.notna().to_numpy().all(axis=1)
+        dates = features_df.index[valid]
+        close = features_df['Close'].to_numpy()[valid]
+        
+        ax_value, ax_drawdown, ax_price = fig.subplots(3, 1, sharex=True,
+                                                       gridspec_kw={'height_ratios': [3, 1, 3]})
+        
+        portfolio_value = np.asarray(self.results.get('portfolio_value', []), dtype=np.float64)
+        if len(portfolio_value) > 0:
+            value_dates = dates[:len(portfolio_value)]
+            drawdown = portfolio_value / np.maximum.accumulate(portfolio_value) - 1
+            # Pic et creux du drawdown maximal ajoutés aux points tracés
+            trough = int(np.argmin(drawdown))
+            peak = int(np.argmax(portfolio_value[:trough + 1]))
+            extremes = [peak, trough]
+            
+            keep = np.union1d(minmax_indices(portfolio_value, max_points), extremes)
+            ax_value.plot(value_dates[keep], portfolio_value[keep], label='Valeur du portefeuille', linewidth=2)
+            ax_value.set_title('Performance du Portefeuille', fontsize=14, fontweight='bold')
+            ax_value.set_ylabel('Valeur ($)', fontsize=12)
+            ax_value.legend()
+            ax_value.grid(True, alpha=0.3)
+            
+            keep = np.union1d(minmax_indices(drawdown, max_points), extremes)
+            ax_drawdown.fill_between(value_dates[keep], drawdown[keep], 0, color='red', alpha=0.3)
+            ax_drawdown.scatter(value_dates[[trough]], drawdown[[trough]], color='red', zorder=5,
+                                label=f'Drawdown max {drawdown[trough]:+.2%}')
+            ax_drawdown.set_ylabel('Drawdown', fontsize=12)
+            ax_drawdown.legend()
+            ax_drawdown.grid(True, alpha=0.3)
+        
+        keep = minmax_indices(close, max_points)
+        ax_price.plot(dates[keep], close[keep], label='Prix de clôture', linewidth=2)
+        
+        # Marquer les points d'achat/vente (au plus un marqueur par tranche de temps et par sens)
+        for action, color, marker, label in (('BUY', 'green', '^', 'Achat'), ('SELL', 'red', 'v', 'Vente')):
+            points = [(t['date'], t['price']) for t in self.results['trades'] if t['action'] == action]
+            if not points:
+                continue
+            trade_dates = pd.DatetimeIndex([d for d, _ in points])
+            prices = np.array([p for _, p in points], dtype=np.float64)
+            keep = marker_indices(trade_dates, max_points)
+            ax_price.scatter(trade_dates[keep], prices[keep], color=color, marker=marker, s=100, label=label,
+                             zorder=5)
+        
+        ax_price.set_title('Prix et Signaux de Trading', fontsize=14, fontweight='bold')
+        ax_price.set_ylabel('Prix ($)', fontsize=12)
+        ax_price.legend()
+        ax_price.grid(True, alpha=0.3)
@@ -0,0 +1,26 @@
+# benchmarks/_synthetic.py
+# Barres OHLCV synthétiques partagées par les benchmarks et test.py
+import numpy as np
+import pandas as pd
+
+# (volatilité de la clôture, bruit de l'ouverture, écart High/Low, bornes du volume) par fréquence
+PROFILES = {
+    'B': (0.01, 0.003, 0.01, (100000, 10000000)),
+    'min': (0.001, 0.0003, 0.001, (1000, 100000))
+}
+
+
+def synthetic_ohlcv(n, seed=0, freq='B', start='2015-01-01'):
+    """
+    Marche aléatoire log-normale de n barres journalières (freq='B') ou minute (freq='min')
+    """
+    volatility, open_noise, spread, volume = PROFILES[freq]
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    return pd.DataFrame({
+        'Open': close * np.exp(rng.normal(0, open_noise, n)),
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(*volume, n).astype(float)
+    }, index=pd.date_range(start, periods=n, freq=freq))
@@ -0,0 +1,42 @@
+# benchmarks/bench_backends.py
+# Durée d'entraînement, latence d'inférence (une ligne) et accuracy de chaque backend de modèle
+# Usage : python benchmarks/bench_backends.py [taille1 taille2 ...]
+import os
+import sys
+import time
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from _synthetic import synthetic_ohlcv
+from features import FeatureEngineer
+from strategy import TradingStrategy, MODEL_BACKENDS
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    print(f"{'lignes':>8} {'backend':<24} {'entraînement':>13} {'p50 une ligne':>14} {'accuracy':>9}")
+    for n in sizes:
+        with contextlib.redirect_stdout(io.StringIO()):
+            features = FeatureEngineer(backend="numpy").calculate_technical_indicators(synthetic_ohlcv(n, freq='min'))
+        for backend in MODEL_BACKENDS:
+            strategy = TradingStrategy(model_backend=backend)
+            design = strategy.design_matrix(features)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                strategy.train_model(design, verbose=False)
+            train_time = time.perf_counter() - start
+
+            rows = design.X[-200:]
+            samples = []
+            for row in rows:
+                start = time.perf_counter()
+                strategy.predict(row[None, :])
+                samples.append(time.perf_counter() - start)
+            latency = np.percentile(samples, 50) * 1e6
+
+            print(f"{n:>8} {backend:<24} {train_time:>12.2f}s {latency:>11.0f} µs {strategy.accuracy:>9.2%}")
@@ -0,0 +1,52 @@
+# benchmarks/bench_backtest.py
+# Backtester.simulate : boucle barre par barre vs moteur vectorisé, de 10^4 à 10^7 barres
+# Usage : python benchmarks/bench_backtest.py [max_barres_boucle]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backtest import Backtester
+
+
+def synthetic_signals(n, seed=0, dtype=np.float64, flip=0.02):
+    """
+    Clôtures en marche aléatoire, prédictions par régimes (changement avec une probabilité flip par barre)
+    et confiances aléatoires
+    """
+    rng = np.random.default_rng(seed)
+    close = (100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))).astype(dtype)
+    predictions = np.cumsum(rng.random(n) < flip) % 2
+    confidence = rng.uniform(0.5, 0.75, n)
+    index = pd.date_range('2000-01-01', periods=n, freq='min')
+    return close, index, predictions, confidence
+
+
+def same_results(a, b):
+    keys = ['final_value', 'total_return', 'sharpe_ratio', 'max_drawdown']
+    return (all(a[k] == b[k] for k in keys) and a['trades'] == b['trades']
+            and np.array_equal(np.asarray(a['portfolio_value']), np.asarray(b['portfolio_value']))
+            and a['returns'].equals(b['returns']))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    max_loop = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    backtester = Backtester()
+    for n in (10**4, 10**5, 10**6, 10**7):
+        args = synthetic_signals(n)
+        fast, fast_time = timed(lambda: backtester.simulate(*args, engine="vectorized"))
+        line = f"{n:>9} barres | vectorisé {fast_time:8.3f}s"
+        if n <= max_loop:
+            loop, loop_time = timed(lambda: backtester.simulate(*args, engine="loop"))
+            line += f" | boucle {loop_time:8.3f}s (x{loop_time / fast_time:.1f}) | identique: {same_results(loop, fast)}"
+        print(line + f" | {len(fast['trades'])} transactions")
@@ -0,0 +1,56 @@
+# benchmarks/bench_design_matrix.py
+# Pic mémoire (tracemalloc) et durée de préparation de la matrice de features :
+# ancien chemin (dropna + prepare_features + tableau contigu) vs TradingStrategy.design_matrix
+# Usage : python benchmarks/bench_design_matrix.py [n_lignes]
+import os
+import sys
+import time
+import tracemalloc
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from _synthetic import synthetic_ohlcv
+from features import FeatureEngineer
+from strategy import TradingStrategy
+
+
+def legacy_path(strategy, features_df):
+    """
+    Chemin de Backtester.run_backtest avant DesignMatrix
+    """
+    df = features_df.dropna()
+    X, y, df_clean = strategy.prepare_features(df)
+    return np.ascontiguousarray(X.to_numpy()), y.to_numpy(), df_clean['Close'].to_numpy()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    for policy in ("float64", "compact"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            features_df = FeatureEngineer(backend="numpy", memory_policy=policy).calculate_technical_indicators(
+                synthetic_ohlcv(n, freq='min'))
+        strategy = TradingStrategy(memory_policy=policy)
+        frame_mb = features_df.memory_usage(deep=True).sum() / 1e6
+
+        (X_old, y_old, _), peak_old, time_old = measure(lambda: legacy_path(strategy, features_df))
+        design, peak_new, time_new = measure(lambda: strategy.design_matrix(features_df))
+        same = np.array_equal(X_old, design.X) and np.array_equal(y_old, design.y)
+
+        print(f"{policy:<8} {n} lignes, DataFrame de features {frame_mb:.0f} Mo | identique: {same}")
+        print(f"   ancien chemin : pic {peak_old / 1e6:7.1f} Mo en {time_old * 1e3:7.1f} ms")
+        print(f"   design_matrix : pic {peak_new / 1e6:7.1f} Mo en {time_new * 1e3:7.1f} ms "
+              f"(matrice {design.nbytes / 1e6:.1f} Mo)")
@@ -0,0 +1,89 @@
+# benchmarks/bench_inference.py
+# Latence p50/p99 d'une prédiction (une ligne), temps et pic mémoire par lot : sklearn vs FastForest
+# Usage : python benchmarks/bench_inference.py [n_lignes] [taille_lot ...]
+import os
+import sys
+import time
+import tracemalloc
+import contextlib
+import io
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from _synthetic import synthetic_ohlcv
+from features import FeatureEngineer
+from strategy import TradingStrategy
+from fastforest import FastForest
+
+
+def latencies(fn, rows, repeat):
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        samples[i] = time.perf_counter() - start
+    return np.percentile(samples, 50) * 1e6, np.percentile(samples, 99) * 1e6
+
+
+def measure(fn, X):
+    """
+    Temps (s) et pic d'allocation (Mo) d'un appel
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(X)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+if __name__ == "__main__":
+    # sklearn avertit à chaque appel quand on lui passe un tableau sans noms de colonnes
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    batch_sizes = [int(size) for size in sys.argv[2:]] or [10**5, 10**6]
+    with contextlib.redirect_stdout(io.StringIO()):
+        features = FeatureEngineer(backend="numpy").calculate_technical_indicators(synthetic_ohlcv(n, start='2010-01-01'))
+        strategy = TradingStrategy()
+        strategy.train_model(features, verbose=False)
+    X, _, _ = strategy.prepare_features(features)
+    X_raw = X.to_numpy(dtype=np.float64)
+    fast = FastForest.from_sklearn(strategy.model, strategy.scaler)
+
+    # Parité
+    pred, proba = fast.predict_with_proba(X_raw)
+    X_scaled = strategy.scaler.transform(X)
+    agree = np.mean(pred == strategy.model.predict(X_scaled))
+    max_diff = np.abs(proba - strategy.model.predict_proba(X_scaled)).max()
+    print(f"Parité : {agree:.2%} de classes identiques, écart max des probabilités {max_diff:.1e}")
+    print(f"Forêt aplatie : {fast.nbytes / 1e6:.2f} Mo, profondeur {fast.depth}, {len(fast.roots)} arbres")
+
+    def sklearn_row(row):
+        scaled = strategy.scaler.transform(row[None, :])
+        strategy.model.predict(scaled)
+        strategy.model.predict_proba(scaled)
+
+    rows = X_raw[-200:]
+    p50, p99 = latencies(sklearn_row, rows, 300)
+    print(f"sklearn    une ligne : p50 {p50:9.1f} µs | p99 {p99:9.1f} µs")
+    p50f, p99f = latencies(fast.predict_with_proba, rows, 3000)
+    print(f"FastForest une ligne : p50 {p50f:9.1f} µs | p99 {p99f:9.1f} µs (x{p50 / p50f:.0f} sur p50)")
+
+    def sklearn_batch(X_batch):
+        scaled = strategy.scaler.transform(X_batch)
+        strategy.model.predict(scaled)
+        strategy.model.predict_proba(scaled)
+
+    # Lots tirés des lignes d'entraînement : le coût ne dépend que du nombre de lignes et de la forêt
+    rng = np.random.default_rng(0)
+    for size in batch_sizes:
+        X_batch = X_raw[rng.integers(0, len(X_raw), size)]
+        time_sklearn, peak_sklearn = measure(sklearn_batch, X_batch)
+        time_fast, peak_fast = measure(fast.predict_with_proba, X_batch)
+        print(f"Lot de {size:>9,} lignes : sklearn {time_sklearn:6.2f} s, pic {peak_sklearn:7.1f} Mo | "
+              f"FastForest {time_fast:6.2f} s, pic {peak_fast:7.1f} Mo")
@@ -0,0 +1,76 @@
+# benchmarks/bench_parsing.py
+# Compare le décodage historique (from_dict + astype + to_datetime) au parseur vectorisé
+# Usage : python benchmarks/bench_parsing.py [payload.json ...]
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from parsing import parse_time_series, parse_csv
+
+
+def legacy_parse(time_series):
+    """Chemin d'origine de DataFetcher.fetch_data"""
+    df = pd.DataFrame.from_dict(time_series, orient='index')
+    df = df.astype(float)
+    df.columns = ['open', 'high', 'low', 'close', 'volume']
+    df.index = pd.to_datetime(df.index)
+    df = df.sort_index()
+    return df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low',
+                              'close': 'Close', 'volume': 'Volume'})
+
+
+def synthetic_payload(n, intraday=False):
+    """Payload au format Alpha Vantage (ordre décroissant) quand aucun fichier n'est fourni"""
+    rng = np.random.default_rng(0)
+    freq = 'min' if intraday else 'B'
+    fmt = '%Y-%m-%d %H:%M:%S' if intraday else '%Y-%m-%d'
+    index = pd.date_range(end='2024-12-31', periods=n, freq=freq)[::-1]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return {
+        t.strftime(fmt): {
+            '1. open': f"{c * 0.999:.4f}", '2. high': f"{c * 1.01:.4f}",
+            '3. low': f"{c * 0.99:.4f}", '4. close': f"{c:.4f}",
+            '5. volume': str(int(v))
+        }
+        for t, c, v in zip(index, close, rng.integers(1e5, 1e7, n))
+    }
+
+
+def to_csv(time_series):
+    lines = ['timestamp,open,high,low,close,volume']
+    lines += [','.join([t] + list(bar.values())) for t, bar in time_series.items()]
+    return '\n'.join(lines)
+
+
+def bench(name, time_series, repeat=5):
+    csv_text = to_csv(time_series)
+    expected = legacy_parse(time_series)
+    expected.index = expected.index.as_unit('ns')
+    pd.testing.assert_frame_equal(parse_time_series(time_series), expected, check_freq=False)
+    pd.testing.assert_frame_equal(parse_csv(csv_text), expected, check_freq=False)
+
+    number = max(1, 20000 // len(time_series))
+    legacy = min(timeit.repeat(lambda: legacy_parse(time_series), number=number, repeat=repeat)) / number
+    fast = min(timeit.repeat(lambda: parse_time_series(time_series), number=number, repeat=repeat)) / number
+    csv = min(timeit.repeat(lambda: parse_csv(csv_text), number=number, repeat=repeat)) / number
+    print(f"{name:<28} {len(time_series):>8} barres | legacy {legacy * 1e3:8.2f} ms | "
+          f"json {fast * 1e3:8.2f} ms (x{legacy / fast:4.1f}) | csv {csv * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            with open(path) as f:
+                payload = json.load(f)
+            key = next(k for k in payload if k.startswith("Time Series"))
+            bench(os.path.basename(path), payload[key])
+    else:
+        bench("daily (20 ans)", synthetic_payload(5000))
+        bench("intraday 1min (30 jours)", synthetic_payload(30 * 390, intraday=True))
+        bench("intraday 1min (1 an)", synthetic_payload(252 * 390, intraday=True))
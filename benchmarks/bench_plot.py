@@ -0,0 +1,63 @@
+# benchmarks/bench_plot.py
+# Backtester.plot_results(path=...) : rendu réduit min/max vs tracé de tous les points, de 10^4 à 10^7 barres
+# Usage : python benchmarks/bench_plot.py [max_barres_tracé_complet]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backtest import Backtester
+
+
+def synthetic_backtest(n, seed=0, flip=0.002):
+    """
+    Backtester avec résultats sur une marche aléatoire minute et les features correspondantes
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    predictions = np.cumsum(rng.random(n) < flip) % 2
+    confidence = rng.uniform(0.5, 0.75, n)
+    index = pd.date_range('2000-01-01', periods=n, freq='min')
+    backtester = Backtester()
+    backtester.results = backtester.simulate(close, index, predictions, confidence)
+    return backtester, pd.DataFrame({'Close': close}, index=index)
+
+
+def full_render(backtester, features_df, path):
+    """
+    Référence : toutes les barres et un marqueur par transaction, comme l'ancien plot_results
+    """
+    fig = Figure(figsize=(12, 12))
+    ax_value, ax_price = fig.subplots(2, 1)
+    ax_value.plot(features_df.index, backtester.results['portfolio_value'], linewidth=2)
+    ax_price.plot(features_df.index, features_df['Close'], linewidth=2)
+    for action, color in (('BUY', 'green'), ('SELL', 'red')):
+        trades = [t for t in backtester.results['trades'] if t['action'] == action]
+        ax_price.scatter([t['date'] for t in trades], [t['price'] for t in trades], color=color, s=100)
+    fig.savefig(path, dpi=100)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    max_full = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'plot.png')
+        for n in (10**4, 10**5, 10**6, 10**7):
+            backtester, features_df = synthetic_backtest(n)
+            fast = timed(lambda: backtester.plot_results(features_df, path=path))
+            line = f"{n:>9} barres | réduit {fast:6.2f}s"
+            if n <= max_full:
+                full = timed(lambda: full_render(backtester, features_df, path))
+                line += f" | complet {full:6.2f}s (x{full / fast:.1f})"
+            print(line + f" | {len(backtester.results['trades'])} transactions")
@@ -0,0 +1,49 @@
+# benchmarks/bench_signals.py
+# Signaux de fin de journée pour un univers : generate_signals symbole par symbole vs generate_batch_signals
+# Usage : python benchmarks/bench_signals.py [n_symboles]
+import os
+import sys
+import time
+import contextlib
+import io
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from _synthetic import synthetic_ohlcv
+from features import FeatureEngineer
+from strategy import TradingStrategy
+from panel import Panel
+from signals import generate_batch_signals
+
+
+if __name__ == "__main__":
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    engineer = FeatureEngineer(backend="numpy")
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = engineer.calculate_technical_indicators(synthetic_ohlcv(1000, start='2020-01-01'))
+        strategy = TradingStrategy()
+        strategy.train_model(base, verbose=False)
+        # Univers : 250 barres par symbole, un modèle commun
+        features = {f"S{i:04d}": engineer.calculate_technical_indicators(synthetic_ohlcv(250, seed=i, start='2020-01-01'))
+                    for i in range(n_symbols)}
+    panel = Panel.from_frames(features, fields=list(base.columns))
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        loop = {symbol: strategy.generate_signals(df) for symbol, df in features.items()}
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = generate_batch_signals(features, strategy)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_panel = generate_batch_signals(panel, strategy)
+    panel_time = time.perf_counter() - start
+
+    same = all(loop[s]['signal'] == batch.loc[s, 'signal'] and loop[s]['confidence'] == batch.loc[s, 'confidence']
+               for s in features)
+    print(f"{n_symbols} symboles | signaux identiques: {same and batch.equals(batch_panel)}")
+    print(f"generate_signals (boucle) : {loop_time * 1e3:8.1f} ms")
+    print(f"batch (dict de DataFrames): {batch_time * 1e3:8.1f} ms (x{loop_time / batch_time:.0f})")
+    print(f"batch (Panel)             : {panel_time * 1e3:8.1f} ms (x{loop_time / panel_time:.0f})")
@@ -0,0 +1,69 @@
+# benchmarks/bench_streaming.py
+# Backtester.run_streaming : durée et pic mémoire en flux vs en mémoire, de 10^5 à 10^7 barres
+# Usage : python benchmarks/bench_streaming.py [taille_des_blocs]
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backtest import Backtester
+
+
+def signal_chunks(n, chunksize, seed=0, flip=0.02):
+    """
+    Générateur de blocs (clôtures, dates, prédictions, confiances) : marche aléatoire continue d'un bloc
+    à l'autre, seul le bloc courant est en mémoire
+    """
+    rng = np.random.default_rng(seed)
+    log_price = np.log(100)
+    regime = 0
+    start = pd.Timestamp('2000-01-01')
+    for offset in range(0, n, chunksize):
+        size = min(chunksize, n - offset)
+        steps = np.cumsum(rng.normal(0, 0.001, size))
+        close = 100 * np.exp(log_price - np.log(100) + steps)
+        log_price += steps[-1]
+        flips = np.cumsum(rng.random(size) < flip)
+        predictions = (regime + flips) % 2
+        regime = predictions[-1]
+        confidence = rng.uniform(0.5, 0.75, size)
+        index = pd.date_range(start + pd.Timedelta(minutes=offset), periods=size, freq='min')
+        yield close, index, predictions, confidence
+
+
+def measured(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def in_memory(n, chunksize):
+    """
+    Mêmes barres concaténées puis simulées d'un bloc (référence)
+    """
+    closes, indexes, predictions, confidences = zip(*signal_chunks(n, chunksize))
+    index = indexes[0].append(list(indexes[1:]))
+    return Backtester().simulate(np.concatenate(closes), index, np.concatenate(predictions),
+                                 np.concatenate(confidences))
+
+
+if __name__ == "__main__":
+    chunksize = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for n in (10**5, 10**6, 10**7):
+        stream, stream_time, stream_peak = measured(lambda: Backtester().run_streaming(signal_chunks(n, chunksize)))
+        line = f"{n:>9} barres | flux {stream_time:7.2f}s {stream_peak:8.1f} Mo"
+        if n <= 10**6:
+            full, full_time, full_peak = measured(lambda: in_memory(n, chunksize))
+            same = (full['final_value'] == stream['final_value'] and full['max_drawdown'] == stream['max_drawdown']
+                    and np.isclose(full['sharpe_ratio'], stream['sharpe_ratio'], rtol=1e-9, atol=0))
+            line += f" | en mémoire {full_time:7.2f}s {full_peak:8.1f} Mo | identique: {same}"
+        print(line)
@@ -0,0 +1,231 @@
+#cache local des barres OHLCV (un fichier colonne par symbole et intervalle)
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+import joblib
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Âge maximal (secondes) avant de redemander l'API ; 0 = toujours compléter
+DEFAULT_MAX_AGE = {"daily": 6 * 3600}
+
+
+class BarCache:
+    def __init__(self, directory=".cache/bars", max_age=None):
+        """
+        Cache disque des barres OHLCV, stocké en colonnes (.npz) par symbole et intervalle
+        """
+        self.directory = directory
+        self.max_age = dict(DEFAULT_MAX_AGE)
+        if max_age:
+            self.max_age.update(max_age)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.directory, f"{symbol.upper()}_{interval}.npz")
+
+    def load(self, symbol, interval):
+        """
+        Charge les barres en cache, ou None si absentes
+        Retourne (df, meta) avec meta = {'fetched_at', 'full'}
+        """
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return None, None
+
+        try:
+            with np.load(path) as archive:
+                index = pd.DatetimeIndex(archive['index'].astype('datetime64[ns]'))
+                df = pd.DataFrame({col: archive[col] for col in OHLCV_COLUMNS}, index=index)
+                meta = {
+                    'fetched_at': float(archive['fetched_at']),
+                    'full': bool(archive['full'])
+                }
+            return df, meta
+        except Exception as e:
+            print(f"⚠️ Cache illisible pour {symbol} ({interval}), ignoré: {e}")
+            return None, None
+
+    def save(self, symbol, interval, df, full=False):
+        """
+        Écrit les barres sur disque (remplacement atomique du fichier)
+        """
+        path = self._path(symbol, interval)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            index=df.index.values.astype('datetime64[ns]').astype(np.int64),
+            fetched_at=np.float64(time.time()),
+            full=np.bool_(full),
+            **{col: df[col].to_numpy() for col in OHLCV_COLUMNS}
+        )
+        os.replace(tmp_path, path)
+
+    def is_fresh(self, interval, meta):
+        """
+        Indique si le cache peut être servi sans interroger l'API
+        """
+        if meta is None:
+            return False
+        max_age = self.max_age.get(interval, 0)
+        return time.time() - meta['fetched_at'] < max_age
+
+    @staticmethod
+    def merge(cached, new):
+        """
+        Fusionne les nouvelles barres dans le cache (les nouvelles valeurs l'emportent)
+        """
+        if cached is None or cached.empty:
+            return new
+        if new is None or new.empty:
+            return cached
+        # Seules les barres à partir de la première nouvelle date sont remplacées
+        head = cached[cached.index < new.index[0]]
+        merged = pd.concat([head, new])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        return merged.sort_index()
+
+
+def compact_covers(last_timestamp, interval, now=None, bars=100):
+    """
+    Vérifie si une requête 'compact' (100 dernières barres) suffit à combler le trou
+    depuis la dernière barre en cache
+    """
+    now = now or pd.Timestamp.now()
+    if interval == "daily":
+        gap = np.busday_count(last_timestamp.date(), now.date())
+        return gap < bars
+    minutes = int(interval.replace("min", ""))
+    # Estimation prudente : on ignore les heures de fermeture du marché
+    return (now - last_timestamp) < pd.Timedelta(minutes=minutes * bars)
+
+
+class MemoryCache:
+    def __init__(self):
+        """
+        Cache mémoire partagé par le processus, avec durée de vie par entrée
+        Les requêtes identiques simultanées sont regroupées en un seul appel
+        """
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.inflight = {}
+
+    def get_or_load(self, key, ttl, loader):
+        """
+        Retourne la valeur en cache si elle est encore valide, sinon appelle loader()
+        Un seul thread exécute loader() pour une clé donnée, les autres attendent son résultat
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            pending = self.inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = Future()
+                self.inflight[key] = pending
+
+        if not owner:
+            return pending.result()
+
+        try:
+            value = loader()
+        except Exception as e:
+            with self.lock:
+                del self.inflight[key]
+            pending.set_exception(e)
+            raise
+
+        with self.lock:
+            # Les échecs (None) ne sont pas mis en cache
+            if value is not None and ttl > 0:
+                self.entries[key] = (time.monotonic() + ttl, value)
+            del self.inflight[key]
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Instance commune à tous les DataFetcher du processus
+SHARED_CACHE = MemoryCache()
+
+
+class FeatureCache:
+    # À incrémenter si le calcul des indicateurs change
+    VERSION = 1
+
+    def __init__(self, directory=".cache/features"):
+        """
+        Cache disque des features, indexé par symbole, intervalle, configuration des indicateurs
+        et empreinte des données d'entrée
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def config_key(cls, **config):
+        """
+        Identifiant court de la configuration (backend, colonnes, types...)
+        """
+        payload = json.dumps({'version': cls.VERSION, **config}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+    @staticmethod
+    def fingerprint(data):
+        """
+        Empreinte des barres OHLCV (dates et valeurs)
+        """
+        digest = hashlib.sha1()
+        digest.update(data.index.values.astype('datetime64[ns]').astype(np.int64).tobytes())
+        digest.update(np.ascontiguousarray(data[OHLCV_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+
+    def _path(self, symbol, interval, config_key):
+        return os.path.join(self.directory, f"{symbol.upper()}_{interval}_{config_key}.pkl")
+
+    def load(self, symbol, interval, config_key):
+        """
+        Retourne l'entrée en cache (dict avec 'features', 'rows', 'fingerprint', 'state') ou None
+        """
+        path = self._path(symbol, interval, config_key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            print(f"⚠️ Cache de features illisible pour {symbol} ({interval}), ignoré: {e}")
+            return None
+
+    def save(self, symbol, interval, config_key, data, features, state):
+        """
+        Enregistre les features, l'empreinte des données sources et l'état incrémental des indicateurs
+        """
+        path = self._path(symbol, interval, config_key)
+        tmp_path = path + ".tmp"
+        joblib.dump({
+            'features': features,
+            'rows': len(data),
+            'fingerprint': self.fingerprint(data),
+            'state': state
+        }, tmp_path)
+        os.replace(tmp_path, path)
+
+    def match(self, entry, data):
+        """
+        Compare les données aux données en cache
+        Retourne "hit" (identiques), "append" (nouvelles barres à la suite) ou None (à recalculer)
+        """
+        if entry is None or len(data) < entry['rows']:
+            return None
+        if self.fingerprint(data.iloc[:entry['rows']]) != entry['fingerprint']:
+            return None
+        return "hit" if len(data) == entry['rows'] else "append"
@@ -2,17 +2,43 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import requests
-import time
+from concurrent.futures import ThreadPoolExecutor
+from api import AlphaVantageClient
+from cache import BarCache, SHARED_CACHE, compact_covers
+from parsing import parse_time_series, parse_csv
+from panel import Panel
+from dtypes import get_policy, apply_ohlcv_dtypes
+from resample import BarAggregator
 
 class DataFetcher:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache_dir=None, calls_per_minute=5, max_workers=1, datatype="json",
+                 quote_ttl=15, bars_ttl=60, memory_cache=SHARED_CACHE, memory_policy="float64",
+                 derive_intraday=False):
         """
         Initialise le DataFetcher avec une clé API Alpha Vantage
+        cache_dir : répertoire du cache disque des barres (None = pas de cache)
+        calls_per_minute : débit autorisé par l'abonnement Alpha Vantage (5 = clé gratuite)
+        max_workers : nombre de requêtes simultanées dans get_multiple_symbols
+        datatype : format des réponses de l'API ("json" ou "csv")
+        quote_ttl, bars_ttl : durée de vie (secondes) des cotations et barres intraday
+        dans le cache mémoire partagé (None = pas de cache mémoire)
+        memory_policy : politique de types et de rétention (voir dtypes.MEMORY_POLICIES)
+        derive_intraday : construit les intervalles intraday à partir d'un seul flux 1 minute
         """
         # ⚠️ INTERVENTION REQUISE : Remplacez par votre clé API Alpha Vantage
         self.api_key = api_key or "VOTRE_CLE_API_ICI"  # Clé gratuite sur https://www.alphavantage.co/support/#api-key
         self.data = None
+        self.cache = BarCache(cache_dir) if cache_dir else None
+        self.max_workers = max_workers
+        self.datatype = datatype
+        self.memory_cache = memory_cache
+        self.quote_ttl = quote_ttl
+        self.bars_ttl = bars_ttl
+        self.memory_policy = get_policy(memory_policy)
+        self.derive_intraday = derive_intraday
+        self.aggregators = {}
+        self.client = AlphaVantageClient(self.api_key, calls_per_minute=calls_per_minute,
+                                         pool_size=max(max_workers, 1))
     
     def fetch_data(self, symbol, period="2y", interval="daily"):
     
@@ -31,55 +57,65 @@ class DataFetcher:
         
         output_size = period_mapping.get(period, "compact")
         
-        url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&outputsize={output_size}&apikey={self.api_key}"
+        df = self._load_bars(symbol, "daily", output_size)
+        if df is None:
+            return None
         
-        print(f"   URL: {url.split('apikey')[0]}...")
+        # CORRECTION : Filtrer pour n'avoir que les dates passées
+        current_date = datetime.now()
+        df = df[df.index <= current_date]
         
-        response = requests.get(url)
-        data = response.json()
+        # Le cache disque peut contenir tout l'historique : même résultat qu'une requête 'compact'
+        if output_size == "compact":
+            df = df.tail(100)
         
-        if "Time Series (Daily)" in data:
-            time_series = data["Time Series (Daily)"]
-            df = pd.DataFrame.from_dict(time_series, orient='index')
-            
-            # Convertir les types de données
-            df = df.astype(float)
-            df.columns = ['open', 'high', 'low', 'close', 'volume']
-            
-            # Trier par date
-            df.index = pd.to_datetime(df.index)
-            df = df.sort_index()
-            
-            # Renommer les colonnes pour correspondre à yfinance
-            df = df.rename(columns={
-                'open': 'Open',
-                'high': 'High', 
-                'low': 'Low',
-                'close': 'Close',
-                'volume': 'Volume'
-            })
-            
-            # CORRECTION : Filtrer pour n'avoir que les dates passées
-            current_date = datetime.now()
-            df = df[df.index <= current_date]
-            
-            # Filtrer selon la période demandée
-            if period in ["1y", "2y", "5y"]:
-                if period == "1y":
-                    start_date = current_date - timedelta(days=365)
-                elif period == "2y":
-                    start_date = current_date - timedelta(days=730)
-                else:  # 5y
-                    start_date = current_date - timedelta(days=1825)
-                
-                df = df[df.index >= start_date]
+        # Filtrer selon la période demandée
+        if period in ["1y", "2y", "5y"]:
+            if period == "1y":
+                start_date = current_date - timedelta(days=365)
+            elif period == "2y":
+                start_date = current_date - timedelta(days=730)
+            else:  # 5y
+                start_date = current_date - timedelta(days=1825)
             
+            df = df[df.index >= start_date]
+        
+        df = apply_ohlcv_dtypes(df, self.memory_policy)
+        if self.memory_policy["retain"]:
             self.data = df
-            print(f"✅ Données Alpha Vantage récupérées: {len(df)} jours")
-            if len(df) > 0:
-                print(f"   Période: {df.index[0].strftime('%Y-%m-%d')} to {df.index[-1].strftime('%Y-%m-%d')}")
-                print(f"   Dernier prix: ${df['Close'].iloc[-1]:.2f}")
-            return df
+        print(f"✅ Données Alpha Vantage récupérées: {len(df)} jours")
+        if len(df) > 0:
+            print(f"   Période: {df.index[0].strftime('%Y-%m-%d')} to {df.index[-1].strftime('%Y-%m-%d')}")
+            print(f"   Dernier prix: ${df['Close'].iloc[-1]:.2f}")
+        return df
+                
+     except Exception as e:
+        print(f"❌ Erreur lors de la récupération des données: {e}")
+        return None
+    
+    def _request_series(self, symbol, interval, output_size):
+        """
+        Interroge Alpha Vantage et retourne les barres OHLCV triées, ou None
+        """
+        if interval == "daily":
+            params = {"function": "TIME_SERIES_DAILY", "symbol": symbol, "outputsize": output_size}
+            time_series_key = "Time Series (Daily)"
+        else:
+            params = {"function": "TIME_SERIES_INTRADAY", "symbol": symbol, "interval": interval, "outputsize": output_size}
+            # La clé varie selon l'intervalle (ex: "Time Series (5min)")
+            time_series_key = f"Time Series ({interval})"
+        
+        print(f"   Requête: {params['function']} {symbol} ({output_size})...")
+        
+        if self.datatype == "csv":
+            params["datatype"] = "csv"
+        
+        data = self.client.query(**params)
+        
+        if isinstance(data, str):
+            return parse_csv(data)
+        if time_series_key in data:
+            return parse_time_series(data[time_series_key])
         else:
             error_msg = data.get("Error Message", "Unknown error")
             note_msg = data.get("Note", "")
@@ -87,10 +123,42 @@ class DataFetcher:
             if note_msg:
                 print(f"   Note: {note_msg}")
             return None
-                
-     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des données: {e}")
-        return None
+    
+    def _load_bars(self, symbol, interval, output_size):
+        """
+        Lit le cache disque puis ne demande à l'API que les barres manquantes
+        """
+        if self.cache is None:
+            return self._request_series(symbol, interval, output_size)
+        
+        cached, meta = self.cache.load(symbol, interval)
+        
+        if cached is not None and not cached.empty:
+            # Une requête 'full' n'est servie par le cache que s'il contient tout l'historique
+            if output_size == "full" and not meta['full']:
+                request_size = "full"
+            elif self.cache.is_fresh(interval, meta):
+                print(f"💾 Cache à jour pour {symbol} ({interval}): {len(cached)} barres")
+                return cached
+            elif compact_covers(cached.index[-1], interval):
+                request_size = "compact"
+            else:
+                request_size = "full"
+        else:
+            request_size = output_size
+        
+        new = self._request_series(symbol, interval, request_size)
+        if new is None:
+            if cached is not None and not cached.empty:
+                print(f"⚠️ API indisponible, utilisation du cache ({len(cached)} barres)")
+                return cached
+            return None
+        
+        merged = BarCache.merge(cached, new)
+        full = request_size == "full" or (meta is not None and meta['full'])
+        self.cache.save(symbol, interval, merged, full=full)
+        print(f"💾 Cache mis à jour pour {symbol} ({interval}): +{len(merged) - (len(cached) if cached is not None else 0)} barres")
+        return merged
     
     def fetch_data_with_dates(self, symbol, start_date="2023-01-01", end_date=None):
         """
@@ -102,14 +170,25 @@ class DataFetcher:
                 
             print(f"🔍 Recherche des données pour {symbol} du {start_date} au {end_date}...")
             
+            start_dt = pd.to_datetime(start_date)
+            end_dt = pd.to_datetime(end_date)
+            
+            # Servir directement depuis le disque si le cache couvre la plage
+            df = None
+            if self.cache is not None:
+                cached, meta = self.cache.load(symbol, "daily")
+                if cached is not None and not cached.empty and meta['full'] and cached.index[-1] >= end_dt:
+                    print(f"💾 Plage servie depuis le cache ({len(cached)} barres)")
+                    # Même post-traitement que fetch_data : dates passées uniquement, types de la politique
+                    df = apply_ohlcv_dtypes(cached[cached.index <= datetime.now()], self.memory_policy)
+            
             # Récupérer les données complètes
-            df = self.fetch_data(symbol, period="5y")
+            if df is None:
+                df = self.fetch_data(symbol, period="5y")
             if df is None:
                 return None
             
             # Filtrer par dates
-            start_dt = pd.to_datetime(start_date)
-            end_dt = pd.to_datetime(end_date)
             filtered_df = df[(df.index >= start_dt) & (df.index <= end_dt)]
             
             if filtered_df.empty:
@@ -123,15 +202,64 @@ class DataFetcher:
             print(f"❌ Erreur: {e}")
             return None
     
-    def get_multiple_symbols(self, symbols, period="1y"):
+    def _derived_bars(self, symbol, interval):
+        """
+        Construit les barres de l'intervalle demandé à partir du flux 1 minute du symbole
+        Un seul appel amont par symbole, quel que soit le nombre d'intervalles suivis
+        """
+        key = (symbol, interval)
+        # Historique complet au premier appel ou après un trou de plus de 100 minutes,
+        # sinon seulement les dernières minutes
+        aggregator = self.aggregators.get(key)
+        covered = (aggregator is not None and aggregator.last_timestamp is not None
+                   and compact_covers(aggregator.last_timestamp, "1min"))
+        output_size = "compact" if covered else "full"
+        minutes = self._cached(("bars", symbol, "1min", output_size), self.bars_ttl,
+                               lambda: self._load_bars(symbol, "1min", output_size))
+        if minutes is None:
+            return None
+        
+        aggregator = self.aggregators.setdefault(key, BarAggregator(interval))
+        aggregator.update(minutes)
+        print(f"🧱 Barres {interval} dérivées du flux 1min pour {symbol}")
+        return aggregator.bars
+    
+    def _cached(self, key, ttl, loader):
+        """
+        Passe par le cache mémoire partagé (TTL + regroupement des requêtes simultanées)
+        Les DataFrame sont servis en copie superficielle (copy-on-write) : modifier ou compléter
+        le résultat, par exemple avec inplace=True, ne touche pas l'entrée partagée
+        """
+        if self.memory_cache is None or not ttl:
+            return loader()
+        value = self.memory_cache.get_or_load(key, ttl, loader)
+        if isinstance(value, pd.DataFrame):
+            return value.copy(deep=False)
+        return value
+    
+    def get_multiple_symbols(self, symbols, period="1y", max_workers=None, as_panel=False):
         """
         Récupère les données pour plusieurs symboles
+        Les requêtes partagent la session HTTP et le limiteur de débit du client
+        as_panel : retourne un Panel aligné sur un calendrier commun au lieu d'un dict
+        max_workers : au plus self.max_workers, la taille du pool de connexions du client
         """
-        data_dict = {}
-        for symbol in symbols:
+        # Au-delà de pool_maxsize, urllib3 jette les connexions en trop au lieu de les réutiliser
+        max_workers = min(max_workers or self.max_workers, self.max_workers)
+        
+        def fetch(symbol):
             print(f"\n📊 Récupération des données pour {symbol}...")
-            data_dict[symbol] = self.fetch_data(symbol, period)
-            time.sleep(1)  # Respecter les limites de l'API
+            return self.fetch_data(symbol, period)
+        
+        if max_workers <= 1:
+            data_dict = {symbol: fetch(symbol) for symbol in symbols}
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(fetch, symbols))
+            data_dict = dict(zip(symbols, results))
+        
+        if as_panel:
+            return Panel.from_frames(data_dict, dtype=self.memory_policy["price"])
         return data_dict
     
     def get_features(self):
@@ -145,83 +273,59 @@ class DataFetcher:
      try:
         print(f"🔍 Récupération des données intraday pour {symbol} ({interval})...")
         
-        url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval={interval}&outputsize={output_size}&apikey={self.api_key}"
-        
-        print(f"   URL: {url.split('apikey')[0]}...")
-        
-        response = requests.get(url)
-        data = response.json()
+        if self.derive_intraday and interval != "1min":
+            df = self._derived_bars(symbol, interval)
+        else:
+            df = self._cached(("bars", symbol, interval, output_size), self.bars_ttl,
+                              lambda: self._load_bars(symbol, interval, output_size))
+        if df is None:
+            return None
         
-        # La clé varie selon l'intervalle (ex: "Time Series (5min)")
-        time_series_key = f"Time Series ({interval})"
+        # Même fenêtre que la réponse 'compact' de l'API
+        if output_size == "compact":
+            df = df.tail(100)
         
-        if time_series_key in data:
-            time_series = data[time_series_key]
-            df = pd.DataFrame.from_dict(time_series, orient='index')
-            
-            # Convertir les types de données
-            df = df.astype(float)
-            df.columns = ['open', 'high', 'low', 'close', 'volume']
-            
-            # Trier par date
-            df.index = pd.to_datetime(df.index)
-            df = df.sort_index()
-            
-            # Renommer les colonnes pour correspondre au format
-            df = df.rename(columns={
-                'open': 'Open',
-                'high': 'High', 
-                'low': 'Low',
-                'close': 'Close',
-                'volume': 'Volume'
-            })
-            
+        df = apply_ohlcv_dtypes(df, self.memory_policy)
+        if self.memory_policy["retain"]:
             self.data = df
-            print(f"✅ Données intraday récupérées: {len(df)} périodes de {interval}")
-            if len(df) > 0:
-                print(f"   Période: {df.index[0].strftime('%Y-%m-%d %H:%M')} to {df.index[-1].strftime('%Y-%m-%d %H:%M')}")
-                print(f"   Dernier prix: ${df['Close'].iloc[-1]:.2f}")
-            return df
-        else:
-            error_msg = data.get("Error Message", "Unknown error")
-            note_msg = data.get("Note", "")
-            print(f"❌ Erreur Alpha Vantage: {error_msg}")
-            if note_msg:
-                print(f"   Note: {note_msg}")
-            return None
+        print(f"✅ Données intraday récupérées: {len(df)} périodes de {interval}")
+        if len(df) > 0:
+            print(f"   Période: {df.index[0].strftime('%Y-%m-%d %H:%M')} to {df.index[-1].strftime('%Y-%m-%d %H:%M')}")
+            print(f"   Dernier prix: ${df['Close'].iloc[-1]:.2f}")
+        return df
             
      except Exception as e:
         print(f"❌ Erreur lors de la récupération des données intraday: {e}")
         return None
-
-def fetch_current_price(self, symbol):
-    """
-    Récupère le prix actuel et les données récentes
-    """
-    try:
-        print(f"🔍 Récupération du prix actuel pour {symbol}...")
-        
-        url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={self.api_key}"
-        
-        response = requests.get(url)
-        data = response.json()
-        
-        if "Global Quote" in data:
-            quote = data["Global Quote"]
-            current_data = {
-                'symbol': symbol,
-                'price': float(quote['05. price']),
-                'change': float(quote['09. change']),
-                'change_percent': quote['10. change percent'],
-                'timestamp': datetime.now()
-            }
+    
+    def fetch_current_price(self, symbol):
+        """
+        Récupère le prix actuel et les données récentes
+        """
+        try:
+            print(f"🔍 Récupération du prix actuel pour {symbol}...")
+        
+            def load_quote():
+                data = self.client.query(function="GLOBAL_QUOTE", symbol=symbol)
+                return data.get("Global Quote") or None
             
-            print(f"✅ Prix actuel: ${current_data['price']:.2f} ({current_data['change_percent']})")
-            return current_data
-        else:
-            print("❌ Impossible de récupérer le prix actuel")
-            return None
+            quote = self._cached(("quote", symbol), self.quote_ttl, load_quote)
+        
+            if quote:
+                current_data = {
+                    'symbol': symbol,
+                    'price': float(quote['05. price']),
+                    'change': float(quote['09. change']),
+                    'change_percent': quote['10. change percent'],
+                    'timestamp': datetime.now()
+                }
             
-    except Exception as e:
-        print(f"❌ Erreur: {e}")
-        return None
+                print(f"✅ Prix actuel: ${current_data['price']:.2f} ({current_data['change_percent']})")
+                return current_data
+            else:
+                print("❌ Impossible de récupérer le prix actuel")
+                return None
+            
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
+            return None
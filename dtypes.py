@@ -0,0 +1,102 @@
+#politique de types et d'empreinte mémoire (données → features → stratégie)
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# price : OHLC, volume : Volume, feature : indicateurs et matrice X
+# retain : garder la dernière copie dans DataFetcher.data / FeatureEngineer.features
+MEMORY_POLICIES = {
+    "float64": {"price": np.float64, "volume": np.float64, "feature": np.float64, "retain": True},
+    "compact": {"price": np.float32, "volume": np.int64, "feature": np.float32, "retain": False},
+    "minimal": {"price": np.float32, "volume": np.uint32, "feature": np.float32, "retain": False},
+}
+
+
+def get_policy(policy="float64"):
+    """
+    Retourne la politique demandée (nom ou dict déjà résolu)
+    """
+    if isinstance(policy, dict):
+        return policy
+    if policy not in MEMORY_POLICIES:
+        raise ValueError(f"Politique mémoire inconnue: {policy} (choix: {', '.join(MEMORY_POLICIES)})")
+    return MEMORY_POLICIES[policy]
+
+
+def apply_ohlcv_dtypes(df, policy="float64"):
+    """
+    Convertit les colonnes OHLCV selon la politique (df retourné tel quel si les types correspondent déjà)
+    """
+    policy = get_policy(policy)
+    if df is None:
+        return None
+
+    dtypes = {col: policy["price"] for col in PRICE_COLUMNS if col in df.columns}
+    if 'Volume' in df.columns:
+        volume_dtype = np.dtype(policy["volume"])
+        if volume_dtype.kind in "ui":
+            volume = df['Volume']
+            # Repli sur int64 si le volume ne tient pas dans le type demandé
+            if len(volume) and volume.max() > np.iinfo(volume_dtype).max:
+                volume_dtype = np.dtype(np.int64)
+        dtypes['Volume'] = volume_dtype
+
+    if all(df[col].dtype == dtype for col, dtype in dtypes.items()):
+        return df
+    return df.astype(dtypes)
+
+
+def apply_feature_dtype(df, columns, policy="float64"):
+    """
+    Convertit les colonnes de features au type de la politique
+    """
+    dtype = np.dtype(get_policy(policy)["feature"])
+    columns = [col for col in columns if col in df.columns and df[col].dtype != dtype]
+    if not columns:
+        return df
+    return df.astype({col: dtype for col in columns})
+
+
+def bars_per_year(index):
+    """
+    Estime le nombre de barres par an à partir de l'index (252 séances)
+    """
+    if len(index) == 0:
+        return 252
+    per_day = pd.Series(1, index=index).groupby(index.normalize()).size().median()
+    return int(round(per_day * 252))
+
+
+def memory_report(df, periods_per_year=None):
+    """
+    Empreinte mémoire d'un DataFrame : octets au total, par barre et par symbole-année
+    """
+    if df is None or df.empty:
+        return None
+    total = int(df.memory_usage(index=True, deep=True).sum())
+    periods_per_year = periods_per_year or bars_per_year(df.index)
+    per_row = total / len(df)
+    return {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'bytes': total,
+        'bytes_per_row': per_row,
+        'bytes_per_symbol_year': per_row * periods_per_year,
+        'dtypes': df.dtypes.astype(str).value_counts().to_dict()
+    }
+
+
+def print_memory_report(df, label="", periods_per_year=None):
+    """
+    Affiche le rapport d'empreinte mémoire
+    """
+    report = memory_report(df, periods_per_year)
+    if report is None:
+        print("❌ Aucune donnée pour le rapport mémoire")
+        return None
+    print(f"🧮 Mémoire {label}: {report['bytes'] / 1e6:.2f} Mo pour {report['rows']} barres × {report['columns']} colonnes")
+    print(f"   {report['bytes_per_row']:.0f} octets/barre, {report['bytes_per_symbol_year'] / 1e3:.1f} Ko par symbole-année")
+    print(f"   Types: {report['dtypes']}")
+    return report
@@ -0,0 +1,155 @@
+#inférence rapide du RandomForest : forêt aplatie en tableaux, StandardScaler intégré aux seuils
+
+import json
+import os
+import numpy as np
+
+# Version du format d'artefact écrit par FastForest.save
+ARTIFACT_VERSION = 1
+ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots')
+
+# Nombre de couples (arbre, ligne) parcourus à la fois : borne la mémoire de l'inférence par lot
+BLOCK_ELEMENTS = 1 << 16
+
+
+class FastForest:
+    """
+    Forêt de décision aplatie : tous les arbres dans des tableaux contigus
+    Un seul parcours donne la classe et les probabilités, pour un lot ou une seule ligne
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.depth = depth
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """
+        Construit la forêt à partir d'un RandomForestClassifier entraîné
+        scaler : StandardScaler appliqué avant le modèle ; il est intégré aux seuils
+        (x_normalisé <= s  <=>  x <= s * scale + mean), la forêt prend alors les features brutes
+        """
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left < 0
+            node_ids = np.arange(n_nodes)
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+            threshold = tree.threshold.astype(np.float64)
+            if scaler is not None:
+                threshold = np.where(is_leaf, 0.0, threshold * scaler.scale_[feature] + scaler.mean_[feature])
+
+            # Les feuilles pointent sur elles-mêmes : le parcours peut faire depth pas sans test
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            # Probabilités par feuille, normalisées comme DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(feature)
+            thresholds.append(threshold)
+            children.append(np.stack([left, right], axis=1))
+            values.append(value / normalizer)
+            roots.append(offset)
+            offset += n_nodes
+            depth = max(depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.ascontiguousarray(np.concatenate(children)),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.array(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            depth=depth
+        )
+
+    def _leaves(self, X):
+        """
+        Indices des feuilles atteintes, tableau (arbres, lignes)
+        Tous les arbres avancent d'un niveau à la fois ; les accès passent par np.take sur des vues à plat
+        """
+        n, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(n) * n_features)[None, :]
+        children = self.children.ravel()
+        nodes = np.repeat(self.roots[:, None], n, axis=1)
+        for _ in range(self.depth):
+            go_right = np.take(flat, row_offsets + np.take(self.feature, nodes)) > np.take(self.threshold, nodes)
+            nodes = np.take(children, 2 * nodes + go_right)
+        return nodes
+
+    def predict_with_proba(self, X):
+        """
+        Retourne (classes prédites, probabilités) en un seul parcours de la forêt
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        n_trees = len(self.roots)
+        proba = np.empty((len(X), self.value.shape[1]))
+        # Lignes traitées par blocs : les temporaires (arbres × lignes du bloc) ne croissent pas avec le lot
+        block = max(1, BLOCK_ELEMENTS // n_trees)
+        for start in range(0, len(X), block):
+            leaves = self._leaves(X[start:start + block])
+            # Somme dans l'ordre des arbres puis moyenne, comme RandomForestClassifier.predict_proba
+            proba[start:start + block] = self.value[leaves].sum(axis=0)
+        proba /= n_trees
+        return self.classes[np.argmax(proba, axis=1)], proba
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+    @property
+    def nbytes(self):
+        """
+        Taille des tableaux de la forêt en octets
+        """
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    @property
+    def mapped(self):
+        """
+        True si les tableaux sont des vues en mémoire mappée (pages partagées entre processus)
+        """
+        return isinstance(self.threshold, np.memmap)
+
+    def save(self, path, metadata=None):
+        """
+        Écrit la forêt dans un répertoire : un .npy par tableau et meta.json (version, classes, métadonnées)
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        meta = dict(metadata or {})
+        meta.update(version=ARTIFACT_VERSION, classes=self.classes.tolist(), depth=int(self.depth))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def open(cls, path, mmap_mode='r'):
+        """
+        Ouvre une forêt écrite par save sans la copier en mémoire (mmap_mode=None pour tout charger)
+        Retourne (forêt, métadonnées)
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Version d'artefact non supportée: {meta.get('version')}")
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in ARRAYS}
+        forest = cls(classes=np.array(meta['classes']), depth=meta['depth'], **arrays)
+        return forest, meta
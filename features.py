@@ -1,76 +1,317 @@
 #calcule des indicateurs (RSI, MA…)
 
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import pandas as pd
 import numpy as np
 import ta
+from panel import Panel
+from indicators import calculate_indicators, INDICATOR_COLUMNS
+from dtypes import get_policy, apply_feature_dtype
+from streaming import StreamingIndicators
+
+INDICATOR_BACKENDS = ("ta", "numpy")
+
+# Graphe des indicateurs : nœud -> (colonnes produites, nœuds requis)
+# L'ordre de déclaration est un ordre de calcul valide
+INDICATOR_GRAPH = {
+    'rsi': (['rsi'], []),
+    'sma_20': (['sma_20'], []),
+    'sma_50': (['sma_50'], []),
+    'ema_12': (['ema_12'], []),
+    'ema_26': (['ema_26'], []),
+    'macd': (['macd', 'macd_signal', 'macd_hist'], []),
+    'bollinger': (['bb_upper', 'bb_lower', 'bb_middle'], []),
+    'stochastic': (['stoch_k', 'stoch_d'], []),
+    'williams_r': (['williams_r'], []),
+    'cci': (['cci'], []),
+    'adx': (['adx'], []),
+    'returns_1d': (['returns_1d'], []),
+    'returns_5d': (['returns_5d'], []),
+    'volatility_10d': (['volatility_10d'], ['returns_1d']),
+    'volume_sma': (['volume_sma'], []),
+    'volume_ratio': (['volume_ratio'], ['volume_sma']),
+}
+
+COLUMN_TO_INDICATOR = {col: node for node, (outputs, _) in INDICATOR_GRAPH.items() for col in outputs}
+
+
+def resolve_indicators(columns=None):
+    """
+    Retourne les nœuds à calculer (dans l'ordre du graphe) pour obtenir les colonnes demandées
+    columns=None : tous les indicateurs
+    """
+    if columns is None:
+        return list(INDICATOR_GRAPH)
+    
+    needed = set()
+    stack = []
+    for col in columns:
+        if col not in COLUMN_TO_INDICATOR:
+            raise ValueError(f"Feature inconnue: {col}")
+        stack.append(COLUMN_TO_INDICATOR[col])
+    while stack:
+        node = stack.pop()
+        if node not in needed:
+            needed.add(node)
+            stack.extend(INDICATOR_GRAPH[node][1])
+    return [node for node in INDICATOR_GRAPH if node in needed]
+
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _feature_worker(task):
+    """
+    Calcule les features d'un symbole dans un processus du pool
+    Les entrées sont lues et les résultats écrits directement en mémoire partagée
+    """
+    in_name, out_name, total_rows, n_columns, start, stop, backend, columns = task
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        inputs = np.ndarray((total_rows, len(OHLCV_COLUMNS)), dtype=np.float64, buffer=shm_in.buf)
+        outputs = np.ndarray((total_rows, n_columns), dtype=np.float64, buffer=shm_out.buf)
+        data = pd.DataFrame(inputs[start:stop], columns=OHLCV_COLUMNS)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = FeatureEngineer(backend=backend).calculate_technical_indicators(data, columns=columns)
+        indicator_columns = [col for col in INDICATOR_COLUMNS if columns is None or col in columns]
+        outputs[start:stop] = df[indicator_columns].to_numpy(dtype=np.float64)
+        del inputs, outputs
+    finally:
+        shm_in.close()
+        shm_out.close()
+    return start
+
 
 class FeatureEngineer:
-    def __init__(self):
+    def __init__(self, memory_policy="float64", backend="ta", cache=None):
+        """
+        memory_policy : politique de types et de rétention (voir dtypes.MEMORY_POLICIES)
+        backend : "ta" (un appel par indicateur) ou "numpy" (un seul passage, voir indicators.py)
+        cache : FeatureCache utilisé par calculate_cached (None = pas de cache)
+        """
+        if backend not in INDICATOR_BACKENDS:
+            raise ValueError(f"Backend d'indicateurs inconnu: {backend}")
         self.features = None
+        self.memory_policy = get_policy(memory_policy)
+        self.backend = backend
+        self.cache = cache
     
-    def calculate_technical_indicators(self, data):
+    def calculate_technical_indicators(self, data, inplace=False, columns=None):
         """
         Calcule les indicateurs techniques
+        inplace : ajoute les colonnes directement à data au lieu de travailler sur une copie
+        columns : features demandées ; seuls ces indicateurs et leurs dépendances sont calculés
         """
+        if isinstance(data, Panel):
+            return self._calculate_panel(data, columns)
+        
         if data is None or data.empty:
             return None
             
-        df = data.copy()
+        df = data if inplace else data.copy()
         
         try:
-            # RSI
-            df['rsi'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
+            nodes = resolve_indicators(columns)
+            if self.backend == "numpy":
+                indicators = calculate_indicators(df, nodes)
+                for col in indicators.columns:
+                    df[col] = indicators[col]
+            else:
+                self._calculate_ta(df, nodes)
+            
+            # Les dépendances intermédiaires non demandées ne sont pas conservées
+            if columns is not None:
+                intermediates = [col for node in nodes for col in INDICATOR_GRAPH[node][0] if col not in columns]
+                df = df.drop(columns=intermediates)
+            
+            indicator_columns = [col for col in df.columns if col not in ['Open', 'High', 'Low', 'Close', 'Volume']]
+            df = apply_feature_dtype(df, indicator_columns, self.memory_policy)
             
-            # Moyennes mobiles
+            if self.memory_policy["retain"]:
+                self.features = df
+            print(f"✅ {len([col for col in df.columns if col not in ['Open', 'High', 'Low', 'Close', 'Volume']])} indicateurs calculés")
+            return df
+            
+        except Exception as e:
+            print(f"❌ Erreur calcul indicateurs: {e}")
+            return data
+    
+    def _calculate_ta(self, df, nodes):
+        """
+        Backend ta : ajoute à df les indicateurs des nœuds demandés, un appel de bibliothèque par indicateur
+        """
+        nodes = set(nodes)
+        
+        # RSI
+        if 'rsi' in nodes:
+            df['rsi'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
+        
+        # Moyennes mobiles
+        if 'sma_20' in nodes:
             df['sma_20'] = ta.trend.SMAIndicator(df['Close'], window=20).sma_indicator()
+        if 'sma_50' in nodes:
             df['sma_50'] = ta.trend.SMAIndicator(df['Close'], window=50).sma_indicator()
+        if 'ema_12' in nodes:
             df['ema_12'] = ta.trend.EMAIndicator(df['Close'], window=12).ema_indicator()
+        if 'ema_26' in nodes:
             df['ema_26'] = ta.trend.EMAIndicator(df['Close'], window=26).ema_indicator()
-            
-            # MACD
+        
+        # MACD
+        if 'macd' in nodes:
             macd = ta.trend.MACD(df['Close'])
             df['macd'] = macd.macd()
             df['macd_signal'] = macd.macd_signal()
             df['macd_hist'] = macd.macd_diff()
-            
-            # Bollinger Bands
+        
+        # Bollinger Bands
+        if 'bollinger' in nodes:
             bb = ta.volatility.BollingerBands(df['Close'])
             df['bb_upper'] = bb.bollinger_hband()
             df['bb_lower'] = bb.bollinger_lband()
             df['bb_middle'] = bb.bollinger_mavg()
-            
-            # Stochastic
+        
+        # Stochastic
+        if 'stochastic' in nodes:
             stoch = ta.momentum.StochasticOscillator(df['High'], df['Low'], df['Close'])
             df['stoch_k'] = stoch.stoch()
             df['stoch_d'] = stoch.stoch_signal()
-            
-            # Williams %R
+        
+        # Williams %R
+        if 'williams_r' in nodes:
             df['williams_r'] = ta.momentum.WilliamsRIndicator(df['High'], df['Low'], df['Close']).williams_r()
-            
-            # CCI
+        
+        # CCI
+        if 'cci' in nodes:
             df['cci'] = ta.trend.CCIIndicator(df['High'], df['Low'], df['Close']).cci()
-            
-            # ADX
+        
+        # ADX
+        if 'adx' in nodes:
             df['adx'] = ta.trend.ADXIndicator(df['High'], df['Low'], df['Close']).adx()
-            
-            # Retours
+        
+        # Retours
+        if 'returns_1d' in nodes:
             df['returns_1d'] = df['Close'].pct_change()
+        if 'returns_5d' in nodes:
             df['returns_5d'] = df['Close'].pct_change(5)
-            
-            # Volatilité
+        
+        # Volatilité
+        if 'volatility_10d' in nodes:
             df['volatility_10d'] = df['returns_1d'].rolling(10).std()
-            
-            # Volume
+        
+        # Volume
+        if 'volume_sma' in nodes:
             df['volume_sma'] = df['Volume'].rolling(20).mean()
+        if 'volume_ratio' in nodes:
             df['volume_ratio'] = df['Volume'] / df['volume_sma']
+    
+    def calculate_cached(self, data, symbol, interval="daily", columns=None):
+        """
+        Comme calculate_technical_indicators, en passant par le cache de features
+        Si seules de nouvelles barres ont été ajoutées, seule la fin est calculée : l'état incrémental
+        des indicateurs (fenêtres de préchauffage et moyennes exponentielles) est repris du cache
+        Toute modification de l'historique déjà en cache entraîne un recalcul complet
+        """
+        if self.cache is None or data is None or data.empty:
+            return self.calculate_technical_indicators(data, columns=columns)
+        
+        config_key = self.cache.config_key(backend=self.backend, columns=columns,
+                                           feature_dtype=np.dtype(self.memory_policy["feature"]).name)
+        entry = self.cache.load(symbol, interval, config_key)
+        status = self.cache.match(entry, data)
+        indicator_columns = [col for col in INDICATOR_COLUMNS if columns is None or col in columns]
+        
+        if status == "hit":
+            print(f"💾 Features en cache pour {symbol} ({interval}): {len(data)} barres")
+            features = entry['features']
+        elif status == "append":
+            state = entry['state']
+            new_rows = data.iloc[entry['rows']:]
+            tail = state.update_frame(new_rows)
+            tail = apply_feature_dtype(tail[OHLCV_COLUMNS + indicator_columns], indicator_columns, self.memory_policy)
+            features = pd.concat([entry['features'], tail])
+            print(f"💾 Features complétées pour {symbol} ({interval}): +{len(new_rows)} barres")
+            self.cache.save(symbol, interval, config_key, data, features, state)
+        else:
+            features = self.calculate_technical_indicators(data, columns=columns)
+            if features is None:
+                return None
+            state = StreamingIndicators.from_batch(data)
+            self.cache.save(symbol, interval, config_key, data, features, state)
+        
+        if self.memory_policy["retain"]:
+            self.features = features
+        return features
+    
+    def calculate_many(self, data_dict, n_jobs=None, columns=None):
+        """
+        Calcule les features de plusieurs symboles en parallèle (un symbole par tâche)
+        Les OHLCV et les résultats transitent par la mémoire partagée, sans sérialiser de DataFrame
+        Retourne un dict {symbole: DataFrame} identique aux appels séquentiels
+        """
+        frames = {s: df for s, df in data_dict.items() if df is not None and not df.empty}
+        if not frames:
+            return {}
+        
+        n_jobs = n_jobs or os.cpu_count() or 1
+        indicator_columns = [col for col in INDICATOR_COLUMNS if columns is None or col in columns]
+        
+        # Blocs de lignes contigus par symbole
+        bounds = {}
+        total_rows = 0
+        for symbol, df in frames.items():
+            bounds[symbol] = (total_rows, total_rows + len(df))
+            total_rows += len(df)
+        
+        item = np.dtype(np.float64).itemsize
+        shm_in = shared_memory.SharedMemory(create=True, size=max(total_rows * len(OHLCV_COLUMNS) * item, 1))
+        shm_out = shared_memory.SharedMemory(create=True, size=max(total_rows * len(indicator_columns) * item, 1))
+        try:
+            inputs = np.ndarray((total_rows, len(OHLCV_COLUMNS)), dtype=np.float64, buffer=shm_in.buf)
+            outputs = np.ndarray((total_rows, len(indicator_columns)), dtype=np.float64, buffer=shm_out.buf)
+            for symbol, (start, stop) in bounds.items():
+                inputs[start:stop] = frames[symbol][OHLCV_COLUMNS].to_numpy(dtype=np.float64)
             
-            self.features = df
-            print(f"✅ {len([col for col in df.columns if col not in ['Open', 'High', 'Low', 'Close', 'Volume']])} indicateurs calculés")
-            return df
+            # Les plus gros symboles d'abord pour équilibrer la charge
+            tasks = [(shm_in.name, shm_out.name, total_rows, len(indicator_columns), start, stop, self.backend, columns)
+                     for start, stop in sorted(bounds.values(), key=lambda b: b[0] - b[1])]
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                list(executor.map(_feature_worker, tasks))
             
-        except Exception as e:
-            print(f"❌ Erreur calcul indicateurs: {e}")
-            return data
+            results = {}
+            for symbol, (start, stop) in bounds.items():
+                features = pd.DataFrame(outputs[start:stop], index=frames[symbol].index,
+                                        columns=indicator_columns, copy=True)
+                df = pd.concat([frames[symbol], features], axis=1)
+                results[symbol] = apply_feature_dtype(df, indicator_columns, self.memory_policy)
+            del inputs, outputs
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+            shm_out.close()
+            shm_out.unlink()
+        
+        print(f"✅ Features calculées pour {len(results)} symboles sur {n_jobs} processus")
+        return results
+    
+    def _calculate_panel(self, panel, columns=None):
+        """
+        Calcule les indicateurs de chaque symbole et retourne un Panel de features
+        """
+        frames = {}
+        for symbol, frame in panel.frames(dropna=True).items():
+            frames[symbol] = self.calculate_technical_indicators(frame, columns=columns)
+        
+        columns = next(iter(frames.values())).columns
+        features = Panel.from_frames(frames, fields=list(columns), dtype=self.memory_policy["feature"])
+        if self.memory_policy["retain"]:
+            self.features = features
+        return features
     
     def get_feature_columns(self):
         """
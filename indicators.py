@@ -0,0 +1,272 @@
+#backend NumPy des indicateurs : un seul passage, intermédiaires partagés
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+INDICATOR_COLUMNS = ['rsi', 'sma_20', 'sma_50', 'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_hist',
+                     'bb_upper', 'bb_lower', 'bb_middle', 'stoch_k', 'stoch_d', 'williams_r', 'cci', 'adx',
+                     'returns_1d', 'returns_5d', 'volatility_10d', 'volume_sma', 'volume_ratio']
+
+
+def _windows(x, window):
+    """
+    Vue (n - window + 1, window) sans copie sur les fenêtres glissantes
+    """
+    return sliding_window_view(x, window)
+
+
+def _pad(values, window, n):
+    """
+    Replace un résultat de fenêtres glissantes sur n lignes (NaN pendant le préchauffage)
+    """
+    out = np.full(n, np.nan)
+    if n >= window:
+        out[window - 1:] = values
+    return out
+
+
+def _ewm(x, alpha, min_periods):
+    """
+    Équivalent de Series.ewm(alpha, min_periods, adjust=False).mean() par filtrage récursif
+    Les NaN de tête sont ignorés, comme dans pandas
+    """
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out
+    start = valid[0]
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], x[start:], zi=[(1.0 - alpha) * x[start]])
+    out[start:] = y
+    out[start:start + min_periods - 1] = np.nan
+    return out
+
+
+def _wilder_sum(x, window):
+    """
+    Somme lissée de ta.trend.ADXIndicator : somme des window premières valeurs puis s - s/window + x
+    x commence à l'indice 1 (la première barre n'a pas de valeur précédente)
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n <= window:
+        return out
+    first = x[1:window + 1].sum()
+    decay = 1.0 - 1.0 / window
+    y, _ = lfilter([1.0], [1.0, -decay], x[window + 1:], zi=[decay * first])
+    out[window] = first
+    out[window + 1:] = y
+    return out
+
+
+def _safe_divide(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return a / b
+
+
+def compute_indicators(high, low, close, volume, nodes=None):
+    """
+    Calcule les colonnes de FeatureEngineer en un passage sur des tableaux contigus
+    nodes : nœuds de features.INDICATOR_GRAPH à calculer (None = tous)
+    Retourne un dict {colonne: tableau}
+    """
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    volume = np.ascontiguousarray(volume, dtype=np.float64)
+    n = len(close)
+    nodes = None if nodes is None else set(nodes)
+    wanted = lambda *names: nodes is None or any(name in nodes for name in names)
+    empty = lambda: np.full(n, np.nan)
+    out = {}
+
+    prev_close = np.r_[np.nan, close[:-1]]
+
+    # RSI (14)
+    if wanted('rsi'):
+        diff = close - prev_close
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+        ema_up = _ewm(up, 1 / 14, 14)
+        ema_down = _ewm(down, 1 / 14, 14)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['rsi'] = np.where(ema_down == 0, 100, 100 - (100 / (1 + ema_up / ema_down)))
+
+    # Fenêtre de 20 clôtures partagée par sma_20 et les bandes de Bollinger
+    if wanted('sma_20', 'bollinger'):
+        close_20 = _windows(close, 20) if n >= 20 else None
+        sma_20 = _pad(close_20.mean(axis=1), 20, n) if close_20 is not None else empty()
+        if wanted('sma_20'):
+            out['sma_20'] = sma_20
+    if wanted('sma_50'):
+        out['sma_50'] = _pad(_windows(close, 50).mean(axis=1), 50, n) if n >= 50 else empty()
+
+    # EMA calculées une seule fois et réutilisées par le MACD
+    if wanted('ema_12', 'macd'):
+        ema_12 = _ewm(close, 2 / 13, 12)
+        ema_26 = _ewm(close, 2 / 27, 26)
+        if wanted('ema_12'):
+            out['ema_12'] = ema_12
+        if wanted('ema_26'):
+            out['ema_26'] = ema_26
+    elif wanted('ema_26'):
+        out['ema_26'] = _ewm(close, 2 / 27, 26)
+    if wanted('macd'):
+        out['macd'] = ema_12 - ema_26
+        out['macd_signal'] = _ewm(out['macd'], 2 / 10, 9)
+        out['macd_hist'] = out['macd'] - out['macd_signal']
+
+    # Bollinger Bands (20, 2)
+    if wanted('bollinger'):
+        std_20 = _pad(close_20.std(axis=1), 20, n) if close_20 is not None else empty()
+        out['bb_upper'] = sma_20 + 2 * std_20
+        out['bb_lower'] = sma_20 - 2 * std_20
+        out['bb_middle'] = sma_20
+
+    # Extrêmes sur 14 barres partagés par le Stochastique et le Williams %R
+    if wanted('stochastic', 'williams_r'):
+        if n >= 14:
+            lowest = _pad(_windows(low, 14).min(axis=1), 14, n)
+            highest = _pad(_windows(high, 14).max(axis=1), 14, n)
+        else:
+            lowest = highest = empty()
+        price_range = highest - lowest
+        if wanted('stochastic'):
+            out['stoch_k'] = 100 * _safe_divide(close - lowest, price_range)
+            out['stoch_d'] = _pad(_windows(out['stoch_k'], 3).mean(axis=1), 3, n) if n >= 3 else empty()
+        if wanted('williams_r'):
+            out['williams_r'] = -100 * _safe_divide(highest - close, price_range)
+
+    # CCI (20, 0.015)
+    if wanted('cci'):
+        typical_price = (high + low + close) / 3.0
+        if n >= 20:
+            tp_windows = _windows(typical_price, 20)
+            tp_mean = tp_windows.mean(axis=1)
+            mad = np.abs(tp_windows - tp_mean[:, None]).mean(axis=1)
+            out['cci'] = _safe_divide(typical_price - _pad(tp_mean, 20, n), 0.015 * _pad(mad, 20, n))
+        else:
+            out['cci'] = empty()
+
+    # ADX (14), même récurrence que ta
+    if wanted('adx'):
+        out['adx'] = _adx(high, low, prev_close, 14)
+
+    # Rendements et volatilité
+    if wanted('returns_1d', 'volatility_10d'):
+        out['returns_1d'] = close / prev_close - 1
+    if wanted('returns_5d'):
+        returns_5d = empty()
+        returns_5d[5:] = close[5:] / close[:-5] - 1
+        out['returns_5d'] = returns_5d
+    if wanted('volatility_10d'):
+        out['volatility_10d'] = _pad(_windows(out['returns_1d'], 10).std(axis=1, ddof=1), 10, n) if n >= 10 else empty()
+
+    # Volume
+    if wanted('volume_sma', 'volume_ratio'):
+        out['volume_sma'] = _pad(_windows(volume, 20).mean(axis=1), 20, n) if n >= 20 else empty()
+    if wanted('volume_ratio'):
+        out['volume_ratio'] = _safe_divide(volume, out['volume_sma'])
+    return out
+
+
+def _directional_movement(high, low, prev_close):
+    """
+    Vrai range et mouvements directionnels positif / négatif de chaque barre (entrées de l'ADX)
+    """
+    true_range = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    diff_up = np.r_[np.nan, high[1:] - high[:-1]]
+    diff_down = np.r_[np.nan, low[:-1] - low[1:]]
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+    return true_range, pos, neg
+
+
+def _adx(high, low, prev_close, window):
+    n = len(high)
+    adx = np.zeros(n)
+    if n < 2 * window:
+        return adx
+
+    true_range, pos, neg = _directional_movement(high, low, prev_close)
+    trs = _wilder_sum(true_range, window)
+    dip = _wilder_sum(pos, window)
+    din = _wilder_sum(neg, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        di_sum = di_pos + di_neg
+        dx = np.where(di_sum != 0, 100 * np.abs((di_pos - di_neg) / di_sum), 0.0)
+
+    start = 2 * window - 1
+    first = dx[window:start + 1].mean()
+    if n > start + 1:
+        decay = (window - 1) / float(window)
+        y, _ = lfilter([1.0 / window], [1.0, -decay], dx[start + 1:], zi=[decay * first])
+        adx[start + 1:] = y
+    adx[start] = first
+    return adx
+
+
+def recursive_state(high, low, close, window=14):
+    """
+    Valeurs des récurrences (moyennes exponentielles, sommes de Wilder, ADX) après la dernière barre,
+    pour reprendre streaming.StreamingIndicators sans rejouer tout l'historique barre par barre
+    """
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    prev_close = np.r_[np.nan, close[:-1]]
+
+    diff = close - prev_close
+    ema_12 = _ewm(close, 2 / 13, 1)
+    ema_26 = _ewm(close, 2 / 27, 1)
+    macd = ema_12 - ema_26
+    macd[:25] = np.nan
+    true_range, pos, neg = _directional_movement(high, low, prev_close)
+    return {
+        'ema_up': _ewm(np.where(diff > 0, diff, 0.0), 1 / 14, 1)[-1],
+        'ema_down': _ewm(np.where(diff < 0, -diff, 0.0), 1 / 14, 1)[-1],
+        'ema_12': ema_12[-1],
+        'ema_26': ema_26[-1],
+        'macd_signal': _ewm(macd, 2 / 10, 1)[-1],
+        'true_range': _wilder_sum(true_range, window)[-1],
+        'dm_pos': _wilder_sum(pos, window)[-1],
+        'dm_neg': _wilder_sum(neg, window)[-1],
+        'adx': _adx(high, low, prev_close, window)[-1]
+    }
+
+
+def calculate_indicators(data, nodes=None):
+    """
+    Retourne un DataFrame des indicateurs (même index et mêmes colonnes que le backend ta)
+    """
+    values = compute_indicators(data['High'].to_numpy(), data['Low'].to_numpy(),
+                                data['Close'].to_numpy(), data['Volume'].to_numpy(), nodes)
+    columns = [col for col in INDICATOR_COLUMNS if col in values]
+    return pd.DataFrame(values, index=data.index, columns=columns)
+
+
+def check_parity(data, rtol=1e-9):
+    """
+    Compare le backend NumPy au backend ta sur les mêmes données
+    Retourne un DataFrame (écart relatif maximal, NaN identiques, conforme) par colonne
+    """
+    from features import FeatureEngineer
+
+    reference = FeatureEngineer(backend="ta").calculate_technical_indicators(data)
+    fast = FeatureEngineer(backend="numpy").calculate_technical_indicators(data)
+
+    rows = []
+    for col in INDICATOR_COLUMNS:
+        expected = reference[col].to_numpy(dtype=np.float64)
+        actual = fast[col].to_numpy(dtype=np.float64)
+        same_nan = np.array_equal(np.isnan(expected), np.isnan(actual))
+        mask = ~np.isnan(expected) & ~np.isnan(actual)
+        scale = np.maximum(1.0, np.abs(expected[mask]))
+        error = float(np.max(np.abs(expected[mask] - actual[mask]) / scale)) if mask.any() else 0.0
+        rows.append({'column': col, 'max_rel_error': error, 'same_nan': same_nan,
+                     'ok': same_nan and error <= rtol})
+    return pd.DataFrame(rows).set_index('column')
@@ -7,10 +7,18 @@ import os
 sys.path.append(os.path.dirname(__file__))
 
 from data import DataFetcher
-from features import FeatureEngineer
-from strategy import TradingStrategy
-from backtest import Backtester
+from features import FeatureEngineer, INDICATOR_BACKENDS
+from strategy import TradingStrategy, MODEL_BACKENDS
+from backtest import Backtester, frame_chunks
 from realtime import RealTimeTester
+from dtypes import print_memory_report, MEMORY_POLICIES
+from pruning import pruning_report
+from walkforward import walk_forward
+from tuning import search_hyperparameters
+from registry import ModelRegistry
+from robustness import robustness_analysis
+from sweep import parameter_sweep, sweep_configs, DEFAULT_GRID
+from cache import FeatureCache
 
 def main():
     parser = argparse.ArgumentParser(description='Bot de Trading IA')
@@ -20,7 +28,23 @@ def main():
     parser.add_argument('--backtest', action='store_true', help='Lancer le backtest')
     parser.add_argument('--predict', action='store_true', help='Faire une prédiction')
     parser.add_argument('--realtime', action='store_true', help='Test temps réel')
+    parser.add_argument('--prune-report', action='store_true', help='Rapport des indicateurs élagables')
+    parser.add_argument('--walk-forward', choices=['expanding', 'rolling'], help='Validation walk-forward (fenêtre croissante ou glissante)')
+    parser.add_argument('--tune', choices=['grid', 'random'], help="Recherche d'hyperparamètres du modèle")
+    parser.add_argument('--tune-trials', type=int, default=20, help="Nombre d'essais de la recherche aléatoire")
+    parser.add_argument('--time-budget', type=float, help='Durée maximale de la recherche (secondes)')
+    parser.add_argument('--chunk-size', type=int, help='Backtest en flux par blocs de N barres (mémoire constante)')
+    parser.add_argument('--plot-file', type=str, help='Enregistre le graphique du backtest dans ce fichier (sans fenêtre)')
+    parser.add_argument('--robustness', action='store_true', help='Bootstrap et permutations des résultats du backtest')
+    parser.add_argument('--sweep', action='store_true', help='Balayage des seuils et limites des règles de trading')
     parser.add_argument('--api-key', type=str, help='Clé API Alpha Vantage')
+    parser.add_argument('--cache-dir', type=str, default='.cache/bars', help='Répertoire du cache des barres')
+    parser.add_argument('--calls-per-minute', type=int, default=5, help="Débit de l'abonnement Alpha Vantage")
+    parser.add_argument('--memory-policy', type=str, default='float64', choices=list(MEMORY_POLICIES), help='Politique mémoire (float64, compact, minimal)')
+    parser.add_argument('--memory-report', action='store_true', help="Afficher l'empreinte mémoire des données et features")
+    parser.add_argument('--model-backend', type=str, default='random_forest', choices=list(MODEL_BACKENDS), help='Modèle (random_forest, hist_gradient_boosting, sgd)')
+    parser.add_argument('--indicator-backend', type=str, default='ta', choices=list(INDICATOR_BACKENDS), help='Backend des indicateurs (ta, numpy)')
+    parser.add_argument('--no-cache', action='store_true', help='Désactiver le cache disque')
     
     args = parser.parse_args()
     
@@ -28,14 +52,19 @@ def main():
     print("="*50)
     
     # Initialisation
-    data_fetcher = DataFetcher(api_key=args.api_key)
-    feature_engineer = FeatureEngineer()
-    strategy = TradingStrategy()
+    cache_dir = None if args.no_cache else args.cache_dir
+    data_fetcher = DataFetcher(api_key=args.api_key, cache_dir=cache_dir,
+                               calls_per_minute=args.calls_per_minute,
+                               memory_policy=args.memory_policy)
+    feature_cache = None if args.no_cache else FeatureCache(os.path.join(os.path.dirname(args.cache_dir) or '.', 'features'))
+    feature_engineer = FeatureEngineer(memory_policy=args.memory_policy, backend=args.indicator_backend,
+                                       cache=feature_cache)
+    strategy = TradingStrategy(memory_policy=args.memory_policy, model_backend=args.model_backend)
     backtester = Backtester()
     
     if args.realtime:
         # Test temps réel
-        tester = RealTimeTester(api_key=args.api_key)
+        tester = RealTimeTester(api_key=args.api_key, cache_dir=cache_dir)
         tester.test_realtime_predictions(args.symbol, duration_minutes=15, update_interval=2)
         return
     
@@ -46,35 +75,85 @@ def main():
         print("❌ Impossible de récupérer les données")
         return
     
+    # Prédiction seule : ne calculer que les features utilisées par le modèle sauvegardé
+    columns = None
+    registry = ModelRegistry()
+    if args.predict and not (args.train or args.backtest or args.prune_report or args.walk_forward or args.tune or args.sweep):
+        loaded = registry.get(args.symbol)
+        if loaded is not None:
+            strategy = loaded
+            columns = strategy.feature_columns
+    
     # Calcul des indicateurs
-    features_df = feature_engineer.calculate_technical_indicators(data)
+    features_df = feature_engineer.calculate_cached(data, args.symbol, columns=columns)
     
     if features_df is None:
         print("❌ Erreur calcul des indicateurs")
         return
     
+    if args.memory_report:
+        print_memory_report(data, "données")
+        print_memory_report(features_df, "features")
+    
     # Entraînement
     if args.train:
         print("🤖 Entraînement du modèle...")
         if strategy.train_model(features_df):
             strategy.save_model(f'trading_model_{args.symbol}.pkl')
+            # Artefact RandomForest ; un ancien artefact est ignoré s'il est plus vieux que le pickle
+            strategy.save_artifact(f'trading_model_{args.symbol}')
+    
+    # Recherche d'hyperparamètres (le meilleur modèle remplace le modèle sauvegardé)
+    if args.tune:
+        print("🔎 Recherche d'hyperparamètres...")
+        _, best_strategy = search_hyperparameters(features_df, method=args.tune, n_trials=args.tune_trials,
+                                                  time_budget=args.time_budget, memory_policy=args.memory_policy,
+                                                  save_path=f'trading_model_{args.symbol}.pkl')
+        if best_strategy is not None:
+            best_strategy.save_artifact(f'trading_model_{args.symbol}')
+            strategy = best_strategy
+    
+    # Élagage des features
+    if args.prune_report:
+        print("✂️ Analyse des features élagables...")
+        pruning_report(features_df, memory_policy=args.memory_policy)
+    
+    # Validation walk-forward
+    if args.walk_forward:
+        print("🔁 Validation walk-forward...")
+        walk_forward(features_df, mode=args.walk_forward, memory_policy=args.memory_policy,
+                     model_backend=args.model_backend)
     
     # Backtest
     if args.backtest:
         print("📈 Backtest en cours...")
-        results = backtester.run_backtest(features_df, strategy)
+        if args.chunk_size:
+            results = backtester.run_streaming(frame_chunks(features_df, args.chunk_size), strategy)
+        else:
+            results = backtester.run_backtest(features_df, strategy)
         if results:
             backtester.print_results()
-            backtester.plot_results(features_df)
+            if args.robustness:
+                print("🎲 Analyse de robustesse...")
+                robustness_analysis(results)
+            if not args.chunk_size:
+                backtester.plot_results(features_df, path=args.plot_file)
+    
+    # Balayage des règles de trading
+    if args.sweep:
+        print("🧪 Balayage des règles de trading...")
+        parameter_sweep(features_df, strategy, configs=sweep_configs(**DEFAULT_GRID))
     
     # Prédiction
     if args.predict:
         print("🔮 Génération du signal...")
         if not strategy.is_trained:
-            # Charger modèle existant
-            if not strategy.load_model(f'trading_model_{args.symbol}.pkl'):
+            # Charger modèle existant (artefact en mémoire mappée, sinon pickle)
+            loaded = registry.get(args.symbol)
+            if loaded is None:
                 print("❌ Modèle non entraîné")
                 return
+            strategy = loaded
         
         signal = strategy.generate_signals(features_df)
         if signal:
@@ -23,6 +23,8 @@ def train_model(df):
 
     model = RandomForestClassifier(n_estimators=200, max_depth=5, random_state=42)
     model.fit(X_train, y_train)
+    # Features utilisées, pour ne calculer qu'elles à la prédiction
+    model.feature_columns_ = features
 
     train_acc = model.score(X_train, y_train)
     test_acc = model.score(X_test, y_test)
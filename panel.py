@@ -0,0 +1,138 @@
+#panel aligné symboles × temps × champs pour les univers multi-symboles
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class Panel:
+    def __init__(self, values, symbols, index, fields):
+        """
+        values : tableau contigu (symboles, temps, champs), NaN pour les barres absentes
+        symbols, index, fields : libellés des trois axes (calendrier commun)
+        """
+        self.values = values
+        self.symbols = list(symbols)
+        self.index = pd.DatetimeIndex(index)
+        self.fields = list(fields)
+        self._symbol_pos = {s: i for i, s in enumerate(self.symbols)}
+        self._field_pos = {f: i for i, f in enumerate(self.fields)}
+
+    @classmethod
+    def from_frames(cls, frames, fields=None, dtype=np.float64, path=None):
+        """
+        Aligne un dict {symbole: DataFrame} sur le calendrier commun
+        path : répertoire de stockage pour un panel adossé à un fichier mappé en mémoire
+        """
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return None
+
+        symbols = list(frames)
+        if fields is None:
+            fields = [c for c in OHLCV_COLUMNS if all(c in df.columns for df in frames.values())]
+
+        # Calendrier commun : union des dates de tous les symboles
+        index = frames[symbols[0]].index
+        for df in list(frames.values())[1:]:
+            index = index.union(df.index)
+        index = index.sort_values()
+
+        shape = (len(symbols), len(index), len(fields))
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            values = np.lib.format.open_memmap(os.path.join(path, 'values.npy'), mode='w+',
+                                               dtype=dtype, shape=shape)
+            values[:] = np.nan
+        else:
+            values = np.full(shape, np.nan, dtype=dtype)
+
+        for i, symbol in enumerate(symbols):
+            df = frames[symbol]
+            positions = index.get_indexer(df.index)
+            values[i, positions, :] = df[fields].to_numpy(dtype=dtype)
+
+        panel = cls(values, symbols, index, fields)
+        if path is not None:
+            panel._write_meta(path)
+        return panel
+
+    def _write_meta(self, path):
+        np.save(os.path.join(path, 'index.npy'), self.index.values.astype('datetime64[ns]'))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'symbols': self.symbols, 'fields': self.fields}, f)
+
+    def save(self, path):
+        """
+        Écrit le panel sur disque (rechargeable en mémoire mappée avec Panel.open)
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'values.npy'), self.values)
+        self._write_meta(path)
+
+    @classmethod
+    def open(cls, path, mmap_mode='r'):
+        """
+        Ouvre un panel écrit sur disque sans le charger en mémoire
+        """
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode=mmap_mode)
+        index = np.load(os.path.join(path, 'index.npy'))
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        return cls(values, meta['symbols'], index, meta['fields'])
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def mask(self):
+        """
+        Masque des valeurs manquantes (symboles, temps, champs)
+        """
+        return np.isnan(self.values)
+
+    def field(self, name):
+        """
+        Vue (symboles, temps) d'un champ, ex: panel.field('Close')
+        """
+        return self.values[:, :, self._field_pos[name]]
+
+    def frame(self, symbol, dropna=False):
+        """
+        DataFrame d'un symbole, vue sans copie sur le panel
+        dropna : retire les dates où le symbole n'a pas de barre (copie)
+        """
+        df = pd.DataFrame(self.values[self._symbol_pos[symbol]], index=self.index,
+                          columns=self.fields, copy=False)
+        if dropna:
+            df = df.dropna(how='all')
+        return df
+
+    def frames(self, dropna=True):
+        """
+        Dict {symbole: DataFrame}, comme DataFetcher.get_multiple_symbols
+        """
+        return {symbol: self.frame(symbol, dropna=dropna) for symbol in self.symbols}
+
+    def returns(self, field='Close', periods=1):
+        """
+        Rendements (symboles, temps) calculés sur tout l'univers en une opération
+        """
+        prices = self.field(field)
+        result = np.full(prices.shape, np.nan, dtype=prices.dtype)
+        result[:, periods:] = prices[:, periods:] / prices[:, :-periods] - 1
+        return result
+
+    def cross_section(self, timestamp):
+        """
+        DataFrame (symboles × champs) à une date donnée
+        """
+        t = self.index.get_loc(pd.Timestamp(timestamp))
+        return pd.DataFrame(self.values[:, t, :], index=self.symbols, columns=self.fields)
+
+    def __repr__(self):
+        return f"Panel({len(self.symbols)} symboles × {len(self.index)} dates × {len(self.fields)} champs)"
@@ -0,0 +1,61 @@
+#décodage des séries temporelles Alpha Vantage (JSON et CSV) vers des tableaux NumPy
+
+from itertools import chain
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+JSON_FIELDS = ('1. open', '2. high', '3. low', '4. close', '5. volume')
+
+
+def _build_frame(timestamps, values):
+    """
+    Construit le DataFrame final trié à partir des tableaux décodés
+    """
+    index = pd.DatetimeIndex(np.array(timestamps, dtype='datetime64[ns]'))
+    if not index.is_monotonic_increasing:
+        order = np.argsort(index.values, kind='stable')
+        index = index[order]
+        values = values[order]
+    return pd.DataFrame(values, index=index, columns=OHLCV_COLUMNS, copy=False)
+
+
+def parse_time_series(time_series):
+    """
+    Décode le bloc "Time Series (...)" d'une réponse JSON
+    Les valeurs sont lues directement dans un tableau préalloué, dans l'ordre chronologique
+    """
+    n = len(time_series)
+    if n == 0:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([]), dtype=float)
+
+    timestamps = list(time_series)
+    # L'API renvoie les barres de la plus récente à la plus ancienne
+    if n > 1 and timestamps[0] > timestamps[-1]:
+        timestamps.reverse()
+        bars = reversed(time_series.values())
+    else:
+        bars = time_series.values()
+
+    flat = chain.from_iterable(map(itemgetter(*JSON_FIELDS), bars))
+    values = np.fromiter(flat, dtype=np.float64, count=n * 5).reshape(n, 5)
+    return _build_frame(timestamps, values)
+
+
+def parse_csv(text):
+    """
+    Décode une réponse datatype=csv (timestamp,open,high,low,close,volume)
+    """
+    lines = text.strip().splitlines()[1:]
+    n = len(lines)
+    if n == 0:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([]), dtype=float)
+
+    if lines[0] > lines[-1]:
+        lines.reverse()
+    rows = [line.split(',') for line in lines]
+    timestamps = [row[0] for row in rows]
+    flat = chain.from_iterable(row[1:6] for row in rows)
+    values = np.fromiter(flat, dtype=np.float64, count=n * 5).reshape(n, 5)
+    return _build_frame(timestamps, values)
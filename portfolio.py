@@ -0,0 +1,185 @@
+#backtest de portefeuille multi-symboles : flux de barres fusionnés par un tas, trésorerie et limites communes
+
+import heapq
+import time
+import numpy as np
+import pandas as pd
+from panel import Panel
+from signals import model_for
+
+
+class PortfolioBacktester:
+    def __init__(self, initial_capital=100000, max_positions=10, position_size=None,
+                 entry_threshold=0.6, exit_threshold=0.6):
+        """
+        max_positions : nombre maximal de lignes ouvertes en même temps
+        position_size : part de la valeur du portefeuille investie par ligne (défaut 1 / max_positions)
+        entry_threshold / exit_threshold : confiance minimale des signaux d'achat et de vente
+        """
+        self.initial_capital = initial_capital
+        self.max_positions = max_positions
+        self.position_size = position_size or 1.0 / max_positions
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+        self.results = None
+
+    def prepare_streams(self, features, models):
+        """
+        Flux par symbole : horodatages (ns), clôtures et signaux (+1 achat, -1 vente, 0 rien)
+        Les prédictions sont calculées en un appel vectorisé par symbole
+        """
+        frames = features.frames(dropna=True) if isinstance(features, Panel) else features
+        streams = {}
+        for symbol, df in frames.items():
+            strategy = model_for(models, symbol)
+            if strategy is None or not strategy.is_trained:
+                continue
+            design = strategy.design_matrix(df)
+            if design is None:
+                continue
+            predictions, probabilities = strategy.predict(design)
+            confidence = probabilities.max(axis=1)
+            signal = np.zeros(len(design), dtype=np.int8)
+            signal[(predictions == 1) & (confidence > self.entry_threshold)] = 1
+            signal[(predictions == 0) & (confidence > self.exit_threshold)] = -1
+            timestamps = design.index.values.astype('datetime64[ns]').astype(np.int64)
+            # Listes Python : l'accès élément par élément y est bien moins coûteux que sur des tableaux NumPy
+            streams[symbol] = (timestamps.tolist(), np.asarray(design.close, dtype=np.float64).tolist(),
+                               signal.tolist(), confidence.tolist())
+        return streams
+
+    def run(self, features, models, verbose=True):
+        """
+        Rejoue tous les symboles dans l'ordre chronologique avec une trésorerie commune
+        features : dict {symbole: DataFrame de features} ou Panel
+        models : TradingStrategy commune, dict {symbole: TradingStrategy} ou ModelRegistry
+        À chaque date, les ventes passent avant les achats, et les achats par confiance décroissante
+        Retourne un dict de résultats (mêmes clés que Backtester, plus open_positions) ou None
+        """
+        streams = self.prepare_streams(features, models)
+        if not streams:
+            print("❌ Aucun symbole exploitable pour le backtest de portefeuille")
+            return None
+        return self.replay(streams, verbose)
+
+    def replay(self, streams, verbose=True):
+        """
+        Boucle événementielle sur des flux déjà préparés (voir prepare_streams)
+        Coût par barre : un pop et un push sur un tas de la taille du nombre de symboles
+        """
+        symbols = list(streams)
+        # Tas des prochaines barres : (horodatage, rang du symbole, position dans son flux)
+        heap = [(stream[0][0], k, 0) for k, stream in enumerate(streams.values()) if stream[0]]
+        heapq.heapify(heap)
+
+        cash = float(self.initial_capital)
+        holdings = {}      # rang du symbole -> (actions, prix d'entrée)
+        last_price = {}
+        trades = []
+        equity_times = []
+        equity = []
+        n_events = 0
+
+        start = time.perf_counter()
+        while heap:
+            timestamp = heap[0][0]
+            entries = []
+
+            # Toutes les barres de cette date
+            while heap and heap[0][0] == timestamp:
+                _, k, i = heapq.heappop(heap)
+                times, closes, signals, confidences = streams[symbols[k]]
+                price = closes[i]
+                last_price[k] = price
+                n_events += 1
+
+                if k in holdings:
+                    if signals[i] == -1:
+                        shares, entry_price = holdings.pop(k)
+                        cash += shares * price
+                        trades.append((timestamp, k, 'SELL', price, shares, (price - entry_price) * shares))
+                elif signals[i] == 1:
+                    entries.append((-confidences[i], k, price))
+
+                if i + 1 < len(times):
+                    heapq.heappush(heap, (times[i + 1], k, i + 1))
+
+            # Valeur du portefeuille à la clôture de la date (lignes valorisées au dernier prix connu)
+            value = cash + sum(shares * last_price[k] for k, (shares, _) in holdings.items())
+
+            # Achats, les plus confiants d'abord, dans la limite des lignes et de la trésorerie
+            for _, k, price in sorted(entries):
+                if len(holdings) >= self.max_positions or cash <= 0:
+                    break
+                amount = min(cash, value * self.position_size)
+                shares = amount / price
+                cash -= amount
+                holdings[k] = (shares, price)
+                trades.append((timestamp, k, 'BUY', price, shares, 0.0))
+
+            equity_times.append(timestamp)
+            equity.append(cash + sum(shares * last_price[k] for k, (shares, _) in holdings.items()))
+        elapsed = time.perf_counter() - start
+
+        self.results = self._metrics(symbols, trades, equity_times, equity, holdings, elapsed, n_events)
+        if verbose:
+            self.print_results()
+        return self.results
+
+    def _metrics(self, symbols, trades, equity_times, equity, holdings, elapsed, n_events):
+        portfolio_value = pd.Series(equity, index=pd.to_datetime(np.array(equity_times, dtype='datetime64[ns]')))
+        returns = portfolio_value.pct_change().dropna()
+        if len(returns) > 0 and returns.std() > 0:
+            sharpe_ratio = returns.mean() / returns.std() * np.sqrt(252)
+        else:
+            sharpe_ratio = 0
+        rolling_max = portfolio_value.cummax()
+        max_drawdown = ((portfolio_value - rolling_max) / rolling_max).min()
+
+        trades = pd.DataFrame(trades, columns=['date', 'symbol', 'action', 'price', 'shares', 'pnl'])
+        trades['date'] = pd.to_datetime(trades['date'].to_numpy(dtype='datetime64[ns]'))
+        trades['symbol'] = [symbols[k] for k in trades['symbol']]
+
+        final_value = portfolio_value.iloc[-1]
+        return {
+            'initial_capital': self.initial_capital,
+            'final_value': final_value,
+            'total_return': (final_value - self.initial_capital) / self.initial_capital,
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': max_drawdown,
+            'trades': trades,
+            'portfolio_value': portfolio_value,
+            'returns': returns,
+            'open_positions': [symbols[k] for k in holdings],
+            'events': n_events,
+            'elapsed': elapsed
+        }
+
+    def print_results(self):
+        """
+        Affiche les résultats du backtest de portefeuille
+        """
+        if self.results is None:
+            print("❌ Aucun résultat à afficher")
+            return
+
+        results = self.results
+        trades = results['trades']
+        sells = trades[trades['action'] == 'SELL']
+        print("\n" + "="*60)
+        print("📊 RÉSULTATS DU BACKTEST DE PORTEFEUILLE")
+        print("="*60)
+        print(f"💰 Capital initial: ${results['initial_capital']:,.2f}")
+        print(f"💰 Valeur finale: ${results['final_value']:,.2f}")
+        print(f"📈 Rendement total: {results['total_return']:+.2%}")
+        print(f"🎯 Ratio de Sharpe: {results['sharpe_ratio']:.2f}")
+        print(f"📉 Maximum Drawdown: {results['max_drawdown']:+.2%}")
+        print(f"🛒 Trades d'achat: {(trades['action'] == 'BUY').sum()} sur {trades['symbol'].nunique()} symboles")
+        print(f"🏪 Trades de vente: {len(sells)}")
+        if len(sells):
+            print(f"📊 PNL total: ${sells['pnl'].sum():+.2f}")
+            print(f"🎯 Taux de réussite: {(sells['pnl'] > 0).mean():.2%}")
+        print(f"📂 Positions ouvertes: {len(results['open_positions'])}")
+        print(f"⏱️ {results['events']:,} barres rejouées en {results['elapsed']:.2f}s "
+              f"({results['elapsed'] / max(results['events'], 1) * 1e6:.1f} µs/barre)")
+        print("="*60)
@@ -0,0 +1,52 @@
+#élagage des features : quels indicateurs peut-on retirer sans perdre en accuracy
+
+import pandas as pd
+from features import INDICATOR_GRAPH, resolve_indicators
+from strategy import TradingStrategy
+
+
+def pruning_report(features_df, tolerance=0.01, memory_policy="float64"):
+    """
+    Retire une à une les features les moins importantes (importance du RandomForest)
+    et garde chaque retrait tant que l'accuracy reste >= accuracy de référence - tolerance
+    Retourne un dict avec le détail des essais, les features conservées et les indicateurs élagables
+    """
+    baseline = TradingStrategy(memory_policy=memory_policy)
+    if not baseline.train_model(features_df, verbose=False):
+        print("❌ Impossible d'entraîner le modèle de référence")
+        return None
+
+    importances = pd.Series(baseline.model.feature_importances_, index=baseline.feature_columns)
+    kept = list(baseline.feature_columns)
+    rows = []
+
+    print(f"📊 Accuracy de référence: {baseline.accuracy:.2%} ({len(kept)} features)")
+    for column in importances.sort_values().index[:-1]:
+        candidate = [col for col in kept if col != column]
+        strategy = TradingStrategy(memory_policy=memory_policy, feature_columns=candidate)
+        if not strategy.train_model(features_df, verbose=False):
+            continue
+
+        removable = strategy.accuracy >= baseline.accuracy - tolerance
+        if removable:
+            kept = candidate
+        rows.append({
+            'feature': column,
+            'importance': importances[column],
+            'accuracy_without': strategy.accuracy,
+            'removed': removable
+        })
+        print(f"   {'✂️ ' if removable else '📌'} {column:<15} importance {importances[column]:.3f} "
+              f"→ accuracy sans: {strategy.accuracy:.2%}")
+
+    needed = set(resolve_indicators(kept))
+    prunable = [node for node in INDICATOR_GRAPH if node not in needed]
+    print(f"✅ Features conservées ({len(kept)}): {', '.join(kept)}")
+    print(f"✂️ Indicateurs élagables ({len(prunable)}): {', '.join(prunable)}")
+
+    return {
+        'baseline_accuracy': baseline.accuracy,
+        'trials': pd.DataFrame(rows),
+        'kept_features': kept,
+        'prunable_indicators': prunable
+    }
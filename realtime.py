@@ -1,16 +1,22 @@
+import os
 import time
 import pandas as pd
 from datetime import datetime, timedelta
+from streaming import StreamingIndicators
 
 class RealTimeTester:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache_dir=None):
         from data import DataFetcher
         from features import FeatureEngineer
         from strategy import TradingStrategy
+        from cache import FeatureCache
+        from registry import ModelRegistry
         
-        self.data_fetcher = DataFetcher(api_key=api_key)
-        self.feature_engineer = FeatureEngineer()
+        self.data_fetcher = DataFetcher(api_key=api_key, cache_dir=cache_dir)
+        feature_cache = FeatureCache(os.path.join(os.path.dirname(cache_dir) or '.', 'features')) if cache_dir else None
+        self.feature_engineer = FeatureEngineer(cache=feature_cache)
         self.strategy = TradingStrategy()
+        self.registry = ModelRegistry()
         self.prediction_history = []
     
     def test_realtime_predictions(self, symbol, interval="5min", duration_minutes=30, update_interval=5):
@@ -21,15 +27,19 @@ class RealTimeTester:
         print("="*50)
         
         # Charger ou entraîner le modèle
-        model_file = f'trading_model_{symbol}.pkl'
-        if not self.strategy.load_model(model_file):
+        model_file = f'trading_model_{symbol}'
+        loaded = self.registry.get(symbol)
+        if loaded is not None:
+            self.strategy = loaded
+        else:
             print("🤖 Entraînement du modèle...")
             historical_data = self.data_fetcher.fetch_data(symbol, "1y")
             
             if historical_data is not None and len(historical_data) >= 50:
-                features_df = self.feature_engineer.calculate_technical_indicators(historical_data)
+                features_df = self.feature_engineer.calculate_cached(historical_data, symbol)
                 if self.strategy.train_model(features_df):
-                    self.strategy.save_model(model_file)
+                    self.strategy.save_model(f'{model_file}.pkl')
+                    self.strategy.save_artifact(model_file)
                 else:
                     print("❌ Échec de l'entraînement")
                     return
@@ -46,6 +56,9 @@ class RealTimeTester:
         print("="*50)
         
         iteration = 0
+        # Indicateurs mis à jour barre par barre au lieu d'être recalculés sur toute la fenêtre
+        indicators = None
+        features = None
         while datetime.now() < end_time:
             iteration += 1
             current_time = datetime.now().strftime('%H:%M:%S')
@@ -56,8 +69,13 @@ class RealTimeTester:
                 data = self.data_fetcher.fetch_intraday_data(symbol, interval)
                 
                 if data is not None and len(data) > 20:
-                    # Calculer indicateurs
-                    features = self.feature_engineer.calculate_technical_indicators(data)
+                    # Calculer indicateurs (uniquement les nouvelles barres après l'initialisation)
+                    if indicators is None:
+                        indicators, features = StreamingIndicators.from_history(data)
+                    else:
+                        new_features = indicators.update_frame(data)
+                        if new_features is not None:
+                            features = new_features
                     
                     # Générer signal
                     signal = self.strategy.generate_signals(features)
@@ -0,0 +1,132 @@
+#registre des modèles par symbole : chargement paresseux, LRU borné, mesures de chargement
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+from strategy import TradingStrategy
+
+
+class ModelRegistry:
+    def __init__(self, directory=".", capacity=32, mmap_mode='r', pattern="trading_model_{symbol}"):
+        """
+        directory : répertoire des modèles ; pattern : nom du modèle d'un symbole (sans extension)
+        capacity : nombre maximal de modèles gardés en mémoire (les moins récemment utilisés sont libérés)
+        Un artefact (répertoire, voir TradingStrategy.save_artifact) est préféré au pickle .pkl, sauf s'il est périmé
+        """
+        self.directory = directory
+        self.capacity = capacity
+        self.mmap_mode = mmap_mode
+        self.pattern = pattern
+        self.models = OrderedDict()
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def path(self, symbol):
+        return os.path.join(self.directory, self.pattern.format(symbol=symbol))
+
+    def _load(self, symbol):
+        """
+        Charge le modèle d'un symbole : artefact en mémoire mappée, sinon pickle joblib
+        """
+        strategy = TradingStrategy()
+        path = self.path(symbol)
+        if os.path.isdir(path) and not self._stale(path):
+            loaded = strategy.load_artifact(path, mmap_mode=self.mmap_mode, verbose=False)
+            source = 'artifact'
+        elif os.path.exists(f'{path}.pkl'):
+            loaded = strategy.load_model(f'{path}.pkl')
+            source = 'pickle'
+        else:
+            loaded = False
+        return (strategy, source) if loaded else (None, None)
+
+    @staticmethod
+    def _stale(path):
+        """
+        True si l'artefact ne correspond plus au pickle : autre backend, ou pickle réécrit après l'artefact
+        (réentraînement avec un backend sans artefact)
+        """
+        meta_path = os.path.join(path, 'meta.json')
+        pickle_path = f'{path}.pkl'
+        try:
+            with open(meta_path) as f:
+                backend = json.load(f).get('model_backend', 'random_forest')
+        except (OSError, ValueError):
+            return True
+        if backend != 'random_forest':
+            return True
+        return os.path.exists(pickle_path) and os.path.getmtime(pickle_path) > os.path.getmtime(meta_path)
+
+    def get(self, symbol):
+        """
+        Retourne la TradingStrategy du symbole (chargée au premier accès) ou None
+        """
+        with self.lock:
+            if symbol in self.models:
+                self.models.move_to_end(symbol)
+                self.stats[symbol]['hits'] += 1
+                return self.models[symbol]
+
+        start = time.perf_counter()
+        strategy, source = self._load(symbol)
+        load_time = time.perf_counter() - start
+        if strategy is None:
+            return None
+
+        with self.lock:
+            stats = self.stats.setdefault(symbol, {'loads': 0, 'hits': 0})
+            stats.update(source=source, load_ms=load_time * 1000, loads=stats['loads'] + 1)
+            self.models[symbol] = strategy
+            self.models.move_to_end(symbol)
+            while len(self.models) > self.capacity:
+                self.models.popitem(last=False)
+        return strategy
+
+    def evict(self, symbol=None):
+        """
+        Libère le modèle d'un symbole (ou tous les modèles si symbol=None)
+        """
+        with self.lock:
+            if symbol is None:
+                self.models.clear()
+            else:
+                self.models.pop(symbol, None)
+
+    @staticmethod
+    def _sizes(strategy):
+        """
+        (octets résidents, octets mappés) de la forêt d'un modèle
+        Les octets mappés ne sont lus qu'à l'usage et partagés avec les autres processus
+        """
+        forest = strategy.fast_model
+        if forest is None:
+            return 0, 0
+        return (0, forest.nbytes) if forest.mapped else (forest.nbytes, 0)
+
+    def report(self):
+        """
+        Retourne un DataFrame par symbole : source, latence de chargement, taille, accès
+        """
+        rows = []
+        with self.lock:
+            for symbol, stats in self.stats.items():
+                strategy = self.models.get(symbol)
+                resident, mapped = self._sizes(strategy) if strategy is not None else (0, 0)
+                rows.append({'symbol': symbol, 'loaded': strategy is not None, 'source': stats['source'],
+                             'load_ms': stats['load_ms'], 'loads': stats['loads'], 'hits': stats['hits'],
+                             'resident_bytes': resident, 'mapped_bytes': mapped})
+        return pd.DataFrame(rows)
+
+    def print_report(self):
+        report = self.report()
+        if report.empty:
+            print("❌ Aucun modèle chargé")
+            return
+        loaded = report[report['loaded']]
+        print(f"📦 Modèles en mémoire: {len(loaded)}/{self.capacity} "
+              f"| chargement moyen {report['load_ms'].mean():.2f} ms "
+              f"| résident {loaded['resident_bytes'].sum() / 1e6:.1f} Mo "
+              f"| mappé {loaded['mapped_bytes'].sum() / 1e6:.1f} Mo")
@@ -0,0 +1,124 @@
+#agrégation locale des barres : dérive tous les intervalles à partir des barres 1 minute
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Séance régulière (heure de New York, comme les horodatages Alpha Vantage)
+SESSION_OPEN = "09:30"
+SESSION_CLOSE = "16:00"
+
+NS_PER_MINUTE = 60 * 10**9
+
+
+def interval_minutes(interval):
+    """
+    Convertit un intervalle Alpha Vantage ("5min", "60min"...) en minutes
+    """
+    if not interval.endswith("min"):
+        raise ValueError(f"Intervalle non supporté: {interval}")
+    return int(interval[:-3])
+
+
+def _bucket_keys(index, interval):
+    """
+    Clé de regroupement de chaque barre : début de la barre agrégée (ns) ou date de séance
+    """
+    ts = index.values.astype('datetime64[ns]').astype(np.int64)
+    if interval == "daily":
+        return ts - ts % (1440 * NS_PER_MINUTE)
+    step = interval_minutes(interval) * NS_PER_MINUTE
+    return ts - ts % step
+
+
+def session_filter(bars, session_open=SESSION_OPEN, session_close=SESSION_CLOSE):
+    """
+    Ne garde que les barres de la séance régulière (barres étiquetées par leur début)
+    """
+    times = bars.index.strftime('%H:%M')
+    mask = (times >= session_open) & (times < session_close)
+    return bars[mask]
+
+
+def resample_bars(bars, interval):
+    """
+    Agrège des barres fines (ex: 1 minute) en barres de l'intervalle demandé
+    interval : "5min", "15min", "30min", "60min"... ou "daily" (séance régulière uniquement)
+    Les barres sont étiquetées par leur début, comme celles de l'API
+    """
+    if bars is None or bars.empty:
+        return bars
+    if interval == "daily":
+        bars = session_filter(bars)
+        if bars.empty:
+            return bars
+
+    keys = _bucket_keys(bars.index, interval)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+
+    high = bars['High'].to_numpy()
+    low = bars['Low'].to_numpy()
+    volume = bars['Volume'].to_numpy()
+    result = pd.DataFrame({
+        'Open': bars['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(high, starts),
+        'Low': np.minimum.reduceat(low, starts),
+        'Close': bars['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(volume, starts)
+    }, index=pd.DatetimeIndex(keys[starts].astype('datetime64[ns]')))
+    return result
+
+
+class BarAggregator:
+    def __init__(self, interval):
+        """
+        Agrégateur incrémental : reçoit des barres 1 minute et maintient les barres de l'intervalle
+        La dernière barre reste provisoire tant qu'une minute de la barre suivante n'est pas arrivée
+        """
+        self.interval = interval
+        self.completed = None
+        self.pending = None
+        self.last_timestamp = None
+
+    def update(self, minutes):
+        """
+        Intègre les nouvelles minutes et retourne les barres nouvellement terminées
+        """
+        if minutes is None or minutes.empty:
+            return None
+        if self.last_timestamp is not None:
+            minutes = minutes[minutes.index > self.last_timestamp]
+            if minutes.empty:
+                return None
+        self.last_timestamp = minutes.index[-1]
+
+        if self.pending is not None:
+            minutes = pd.concat([self.pending, minutes])
+        bars = resample_bars(minutes, self.interval)
+        if bars is None or bars.empty:
+            self.pending = minutes
+            return None
+
+        # Les minutes de la dernière barre sont gardées pour la compléter au prochain appel
+        last_key = _bucket_keys(bars.index[-1:], self.interval)[0]
+        keys = _bucket_keys(minutes.index, self.interval)
+        self.pending = minutes[keys >= last_key]
+
+        finished = bars.iloc[:-1]
+        if not finished.empty:
+            self.completed = finished if self.completed is None else pd.concat([self.completed, finished])
+        return finished
+
+    @property
+    def bars(self):
+        """
+        Toutes les barres, y compris la dernière barre provisoire
+        Toujours un nouveau DataFrame : l'appelant peut y ajouter des colonnes sans toucher l'agrégateur
+        """
+        current = resample_bars(self.pending, self.interval) if self.pending is not None else None
+        parts = [df for df in (self.completed, current) if df is not None and not df.empty]
+        if not parts:
+            return None
+        return pd.concat(parts) if len(parts) > 1 else parts[0].copy(deep=False)
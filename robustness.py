@@ -0,0 +1,144 @@
+#robustesse des résultats de backtest : bootstrap, bootstrap par blocs et permutations de l'ordre des trades
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+METHODS = ('bootstrap', 'block_bootstrap', 'permutation')
+
+# Taille d'un lot de tirages (tirages × barres) : borne la mémoire d'un worker
+BATCH_ELEMENTS = 2_000_000
+
+
+def trade_returns(trades):
+    """
+    Rendement de chaque aller-retour (vente / achat - 1), dans l'ordre des trades
+    """
+    returns = []
+    entry_price = None
+    for trade in trades:
+        if trade['action'] == 'BUY':
+            entry_price = trade['price']
+        elif entry_price is not None:
+            returns.append(trade['price'] / entry_price - 1)
+            entry_price = None
+    return np.asarray(returns, dtype=np.float64)
+
+
+def path_metrics(returns, periods_per_year=252):
+    """
+    Rendement total, Sharpe annualisé et drawdown maximal de chaque ligne d'une matrice de rendements
+    Le drawdown part d'une valeur initiale de 1, comme la valeur du portefeuille du backtest
+    """
+    equity = np.cumprod(1 + returns, axis=1)
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), 1)
+    max_drawdown = np.minimum(((equity - peaks) / peaks).min(axis=1), 0)
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(returns))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, returns.mean(axis=1) / std * np.sqrt(periods_per_year), 0.0)
+    return np.column_stack([equity[:, -1] - 1, sharpe, max_drawdown])
+
+
+def _resample_batch(method, values, size, block_size, seed):
+    """
+    Un lot de size tirages, générés et évalués en une opération matricielle (exécuté dans un worker joblib)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(values)
+    if method == 'bootstrap':
+        samples = values[rng.integers(0, n, size=(size, n))]
+    elif method == 'block_bootstrap':
+        # Bootstrap circulaire par blocs : conserve l'autocorrélation à l'intérieur des blocs
+        n_blocks = -(-n // block_size)
+        starts = rng.integers(0, n, size=(size, n_blocks, 1))
+        positions = (starts + np.arange(block_size)).reshape(size, -1)[:, :n] % n
+        samples = values[positions]
+    else:
+        samples = rng.permuted(np.broadcast_to(values, (size, n)), axis=1)
+    return path_metrics(samples)
+
+
+def robustness_analysis(results, methods=METHODS, n_resamples=10_000, block_size=20, confidence=0.95,
+                        n_jobs=None, seed=42, verbose=True):
+    """
+    Distribution des métriques d'un backtest (Backtester.results) par rééchantillonnage
+    bootstrap / block_bootstrap : tirages des rendements par barre (results['returns'])
+    permutation : ordre des allers-retours mélangé (results['trades']) ; le rendement total est inchangé,
+    seule la distribution du drawdown a un sens
+    Tirages en lots vectorisés répartis sur n_jobs processus ; chaque lot a sa graine dérivée de seed
+    (SeedSequence), les résultats ne dépendent donc pas de n_jobs
+    Retourne (résumé : observé, moyenne et intervalle de confiance par méthode et métrique,
+    {méthode: DataFrame des métriques de chaque tirage}) ou (None, None)
+    """
+    if results is None or results.get('returns') is None:
+        print("❌ Rendements par barre indisponibles (backtest en flux ?)")
+        return None, None
+
+    series = {
+        'bootstrap': np.asarray(results['returns'], dtype=np.float64),
+        'block_bootstrap': np.asarray(results['returns'], dtype=np.float64),
+        'permutation': trade_returns(results['trades'])
+    }
+    metrics = ['total_return', 'sharpe_ratio', 'max_drawdown']
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    summary, distributions = [], {}
+    start = time.perf_counter()
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for method, seed_sequence in zip(methods, np.random.SeedSequence(seed).spawn(len(methods))):
+            if method not in METHODS:
+                print(f"❌ Méthode de rééchantillonnage inconnue: {method}")
+                continue
+            values = series[method]
+            if len(values) < 2:
+                print(f"⚠️ {method}: pas assez de données ({len(values)})")
+                continue
+
+            batch = max(1, min(n_resamples, BATCH_ELEMENTS // len(values)))
+            sizes = [min(batch, n_resamples - k) for k in range(0, n_resamples, batch)]
+            parts = parallel(
+                delayed(_resample_batch)(method, values, size, block_size, child)
+                for size, child in zip(sizes, seed_sequence.spawn(len(sizes)))
+            )
+            distribution = pd.DataFrame(np.vstack(parts), columns=metrics)
+            observed = path_metrics(values[None, :])[0]
+            if method == 'permutation':
+                # Sharpe et rendement total ne dépendent pas de l'ordre des trades
+                distribution = distribution[['max_drawdown']]
+            distributions[method] = distribution
+
+            alpha = (1 - confidence) / 2
+            for j, metric in enumerate(metrics):
+                if metric not in distribution:
+                    continue
+                column = distribution[metric].to_numpy()
+                summary.append({
+                    'method': method,
+                    'metric': metric,
+                    'observed': observed[j],
+                    'mean': column.mean(),
+                    'low': np.quantile(column, alpha),
+                    'high': np.quantile(column, 1 - alpha),
+                    'p_below_zero': (column < 0).mean()
+                })
+    elapsed = time.perf_counter() - start
+
+    if not summary:
+        return None, None
+    summary = pd.DataFrame(summary).set_index(['method', 'metric'])
+    summary.attrs['elapsed'] = elapsed
+    summary.attrs['confidence'] = confidence
+
+    if verbose:
+        print(f"🎲 {n_resamples:,} tirages par méthode en {elapsed:.1f}s sur {n_jobs} processus "
+              f"(intervalles à {confidence:.0%})")
+        for (method, metric), row in summary.iterrows():
+            print(f"   {method:<16} {metric:<13} observé {row['observed']:+.4f} | "
+                  f"IC [{row['low']:+.4f}, {row['high']:+.4f}] | P(<0) {row['p_below_zero']:.1%}")
+        for method, distribution in distributions.items():
+            median, worst_5, worst_1 = np.quantile(distribution['max_drawdown'], [0.5, 0.05, 0.01])
+            print(f"📉 Drawdown {method}: médian {median:+.2%}, pire 5 % {worst_5:+.2%}, pire 1 % {worst_1:+.2%}")
+
+    return summary, distributions
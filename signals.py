@@ -0,0 +1,107 @@
+#signaux multi-symboles : dernières lignes de features empilées, un seul appel de prédiction par modèle
+
+import numpy as np
+import pandas as pd
+from panel import Panel
+from strategy import TradingStrategy, FEATURE_COLUMNS
+
+# Nombre de lignes de fin examinées avant de parcourir tout l'historique d'un symbole
+LOOKBACK = 32
+
+
+def _last_valid_row(df, columns):
+    """
+    Dernière ligne de df sans NaN sur columns : (horodatage, valeurs) ou None
+    Seule la fin de df est convertie en tableau, sauf si elle ne contient aucune ligne complète
+    """
+    positions = df.columns.get_indexer(columns)
+    for start in (max(len(df) - LOOKBACK, 0), 0):
+        values = df.iloc[start:].to_numpy(dtype=np.float64)[:, positions]
+        valid = np.flatnonzero(~np.isnan(values).any(axis=1))
+        if len(valid):
+            return df.index[start + valid[-1]], values[valid[-1]]
+        if start == 0:
+            break
+    return None
+
+
+def latest_rows(features, columns, symbols=None):
+    """
+    Dernière ligne complète (sans NaN sur columns) de chaque symbole
+    features : dict {symbole: DataFrame} ou Panel
+    Retourne (symboles retenus, matrice (symboles, features), horodatages)
+    """
+    if isinstance(features, Panel):
+        symbols = list(features.symbols if symbols is None else symbols)
+        if any(col not in features.fields for col in columns):
+            return [], np.empty((0, len(columns))), []
+        rows = np.array([features.symbols.index(s) for s in symbols], dtype=np.intp)
+        # Validité (symboles, temps) calculée champ par champ, sans copier le panel
+        valid = np.ones((len(rows), len(features.index)), dtype=bool)
+        for col in columns:
+            valid &= ~np.isnan(features.field(col)[rows])
+        has_row = valid.any(axis=1)
+        last = valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        rows, last = rows[has_row], last[has_row]
+        fields = [features.fields.index(col) for col in columns]
+        X = features.values[rows[:, None], last[:, None], fields]
+        return [s for s, ok in zip(symbols, has_row) if ok], X, list(features.index[last])
+
+    kept, values, timestamps = [], [], []
+    for symbol in (features if symbols is None else symbols):
+        df = features.get(symbol)
+        if df is None or df.empty or any(col not in df.columns for col in columns):
+            continue
+        latest = _last_valid_row(df, columns)
+        if latest is not None:
+            kept.append(symbol)
+            timestamps.append(latest[0])
+            values.append(latest[1])
+    X = np.vstack(values) if values else np.empty((0, len(columns)))
+    return kept, X, timestamps
+
+
+def model_for(models, symbol):
+    """
+    models : une TradingStrategy commune, un dict {symbole: TradingStrategy} ou un ModelRegistry
+    """
+    if isinstance(models, TradingStrategy):
+        return models
+    return models.get(symbol)
+
+
+def generate_batch_signals(features, models):
+    """
+    Génère les signaux de nombreux symboles en regroupant ceux qui partagent un modèle
+    features : dict {symbole: DataFrame de features} ou Panel
+    Retourne un DataFrame indexé par symbole (signal, confiance, prédiction, horodatage) ou None
+    """
+    symbols = features.symbols if isinstance(features, Panel) else list(features)
+
+    # Regroupement par modèle : une seule prédiction vectorisée par groupe
+    groups = {}
+    for symbol in symbols:
+        model = model_for(models, symbol)
+        if model is None or not model.is_trained:
+            continue
+        groups.setdefault(id(model), (model, []))[1].append(symbol)
+
+    parts = []
+    for model, group in groups.values():
+        columns = model.feature_columns or FEATURE_COLUMNS
+        kept, X, timestamps = latest_rows(features, columns, group)
+        if not kept:
+            continue
+        predictions, probabilities = model.predict(X.astype(model.memory_policy["feature"], copy=False))
+        parts.append(pd.DataFrame({
+            'signal': np.where(predictions == 1, "ACHAT", "VENTE"),
+            'confidence': probabilities.max(axis=1),
+            'prediction': predictions,
+            'timestamp': timestamps
+        }, index=pd.Index(kept, name='symbol')))
+
+    if not parts:
+        print("❌ Aucun signal généré")
+        return None
+    signals = pd.concat(parts) if len(parts) > 1 else parts[0]
+    return signals.reindex([s for s in symbols if s in signals.index])
@@ -1,15 +1,106 @@
 # src/strategy.py
+import math
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import SGDClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
+from dtypes import get_policy
+from fastforest import FastForest
+
+FEATURE_COLUMNS = ['rsi', 'sma_20', 'sma_50', 'ema_12', 'ema_26', 'macd', 'macd_signal', 
+                   'macd_hist', 'stoch_k', 'stoch_d', 'williams_r', 'cci', 'adx', 
+                   'returns_1d', 'returns_5d', 'volatility_10d', 'volume_ratio']
+
+# Paramètres du RandomForest (backend par défaut, repris par tuning.py)
+MODEL_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'random_state': 42,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2
+}
+
+# Backends de modèle : classe sklearn et paramètres par défaut
+# "hist_gradient_boosting" s'entraîne vite sur des centaines de milliers de lignes (histogrammes de features)
+# "sgd" est une régression logistique en ligne (update_model l'enrichit sans réentraîner)
+MODEL_BACKENDS = {
+    'random_forest': (RandomForestClassifier, MODEL_PARAMS),
+    'hist_gradient_boosting': (HistGradientBoostingClassifier, {
+        'max_iter': 200,
+        'learning_rate': 0.05,
+        'max_leaf_nodes': 31,
+        'min_samples_leaf': 20,
+        'random_state': 42
+    }),
+    'sgd': (SGDClassifier, {
+        'loss': 'log_loss',
+        'alpha': 1e-4,
+        'max_iter': 1000,
+        'tol': 1e-3,
+        'random_state': 42
+    })
+}
+
+
+def build_model(backend="random_forest", params=None):
+    """
+    Instancie le classifieur d'un backend avec ses paramètres par défaut surchargés par params
+    """
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Backend de modèle inconnu: {backend} (choix: {', '.join(MODEL_BACKENDS)})")
+    model_class, defaults = MODEL_BACKENDS[backend]
+    return model_class(**dict(defaults, **(params or {})))
+
+
+class DesignMatrix:
+    def __init__(self, X, y, index, close, columns):
+        """
+        Matrice de features prête pour le modèle, calculée une fois par TradingStrategy.design_matrix
+        X : tableau contigu (lignes, features) au type de la politique mémoire
+        y : cible (1 si la clôture suivante est plus haute), index et close : dates et clôtures des lignes
+        """
+        self.X = X
+        self.y = y
+        self.index = index
+        self.close = close
+        self.columns = list(columns)
+    
+    def __len__(self):
+        return len(self.X)
+    
+    @property
+    def nbytes(self):
+        return self.X.nbytes + self.y.nbytes + self.close.nbytes
+    
+    def frame(self, rows=slice(None)):
+        """
+        DataFrame sans copie sur les lignes rows de X (pour les estimateurs qui attendent des noms de colonnes)
+        """
+        return pd.DataFrame(self.X[rows], index=self.index[rows], columns=self.columns, copy=False)
+
 
 class TradingStrategy:
-    def __init__(self):
+    def __init__(self, memory_policy="float64", feature_columns=None, model_params=None,
+                 model_backend="random_forest"):
+        """
+        memory_policy : type de la matrice de features (voir dtypes.MEMORY_POLICIES)
+        feature_columns : sous-ensemble de features à utiliser (None = toutes)
+        model_params : paramètres du modèle qui remplacent ceux du backend
+        model_backend : "random_forest", "hist_gradient_boosting" ou "sgd" (voir MODEL_BACKENDS)
+        Après l'entraînement, feature_columns contient les features réellement utilisées par le modèle
+        """
+        if model_backend not in MODEL_BACKENDS:
+            raise ValueError(f"Backend de modèle inconnu: {model_backend} (choix: {', '.join(MODEL_BACKENDS)})")
+        self.memory_policy = get_policy(memory_policy)
+        self.feature_columns = list(feature_columns) if feature_columns else None
+        self.model_backend = model_backend
+        self.model_params = dict(MODEL_BACKENDS[model_backend][1], **(model_params or {}))
+        self.accuracy = None
         self.model = None
+        self.fast_model = None
         self.scaler = StandardScaler()
         self.is_trained = False
     
@@ -20,19 +111,18 @@ class TradingStrategy:
         if features_df is None:
             return None, None, None
             
-        feature_columns = ['rsi', 'sma_20', 'sma_50', 'ema_12', 'ema_26', 'macd', 'macd_signal', 
-                          'macd_hist', 'stoch_k', 'stoch_d', 'williams_r', 'cci', 'adx', 
-                          'returns_1d', 'returns_5d', 'volatility_10d', 'volume_ratio']
+        feature_columns = self.feature_columns or FEATURE_COLUMNS
         
         # Vérifier que les colonnes existent
         available_features = [col for col in feature_columns if col in features_df.columns]
         
-        if len(available_features) < 5:
+        if len(available_features) < min(5, len(feature_columns)):
             print("❌ Pas assez de features disponibles")
             return None, None, None
         
         # Supprimer les lignes avec des valeurs manquantes
-        df_clean = features_df.dropna().copy()
+        # (avec Copy-on-Write, ajouter la cible ne modifie pas features_df : .copy() inutile, mais sans gain mémoire)
+        df_clean = features_df.dropna()
         
         if len(df_clean) < 30:
             print("❌ Pas assez de données après nettoyage")
@@ -42,25 +132,64 @@ class TradingStrategy:
         df_clean['target'] = (df_clean['Close'].shift(-1) > df_clean['Close']).astype(int)
         
         # Features et target
-        X = df_clean[available_features]
+        X = df_clean[available_features].astype(self.memory_policy["feature"])
         y = df_clean['target']
         
         return X, y, df_clean
     
-    def train_model(self, features_df):
+    def design_matrix(self, features_df, min_rows=30):
+        """
+        Construit la DesignMatrix des features : mêmes lignes et mêmes valeurs que prepare_features,
+        mais X est alloué une seule fois (contigu) et rempli colonne par colonne depuis features_df
+        Pic mémoire : X + une colonne temporaire, au lieu de deux copies complètes de features_df
+        (dropna) puis de la sélection des features dans prepare_features
+        min_rows : nombre minimal de lignes complètes (0 pour un bloc du backtest en flux)
+        """
+        if features_df is None:
+            return None
+        if isinstance(features_df, DesignMatrix):
+            return features_df
+        
+        feature_columns = self.feature_columns or FEATURE_COLUMNS
+        available_features = [col for col in feature_columns if col in features_df.columns]
+        
+        if len(available_features) < min(5, len(feature_columns)):
+            print("❌ Pas assez de features disponibles")
+            return None
+        
+        # Lignes sans valeur manquante (comme features_df.dropna())
+        valid = features_df.notna().to_numpy().all(axis=1)
+        n_rows = int(valid.sum())
+        if n_rows < min_rows:
+            print("❌ Pas assez de données après nettoyage")
+            return None
+        
+        X = np.empty((n_rows, len(available_features)), dtype=self.memory_policy["feature"])
+        for j, col in enumerate(available_features):
+            X[:, j] = features_df[col].to_numpy()[valid]
+        close = features_df['Close'].to_numpy()[valid]
+        
+        # Cible : 1 si le prix monte à la barre suivante (0 pour la dernière ligne)
+        y = np.zeros(n_rows, dtype=np.int8)
+        y[:-1] = close[1:] > close[:-1]
+        
+        return DesignMatrix(X, y, features_df.index[valid], close, available_features)
+    
+    def train_model(self, features_df, verbose=True):
         """
         Entraîne le modèle de machine learning
+        verbose : affiche l'accuracy et le rapport de classification
         """
-        X, y, _ = self.prepare_features(features_df)
+        design = self.design_matrix(features_df)
         
-        if X is None or len(X) < 50:
-            print(f"❌ Pas assez de données pour l'entraînement ({len(X) if X is not None else 0} échantillons)")
+        if design is None or len(design) < 50:
+            print(f"❌ Pas assez de données pour l'entraînement ({len(design) if design is not None else 0} échantillons)")
             return False
         
-        # Split train/test
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, shuffle=False, random_state=42
-        )
+        # Split train/test chronologique 80/20 (vues sur la matrice, sans copie)
+        n_train = len(design) - math.ceil(0.2 * len(design))
+        X_train, X_test = design.frame(slice(None, n_train)), design.frame(slice(n_train, None))
+        y_train, y_test = design.y[:n_train], design.y[n_train:]
         
         if len(X_train) == 0 or len(X_test) == 0:
             print("❌ Erreur dans le split train/test")
@@ -71,13 +200,7 @@ class TradingStrategy:
         X_test_scaled = self.scaler.transform(X_test)
         
         # Entraînement du modèle
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            min_samples_split=5,
-            min_samples_leaf=2
-        )
+        self.model = build_model(self.model_backend, self.model_params)
         
         self.model.fit(X_train_scaled, y_train)
         
@@ -85,10 +208,15 @@ class TradingStrategy:
         y_pred = self.model.predict(X_test_scaled)
         accuracy = accuracy_score(y_test, y_pred)
         
-        print(f"📊 Accuracy du modèle: {accuracy:.2%}")
-        print("📈 Rapport de classification:")
-        print(classification_report(y_test, y_pred))
+        if verbose:
+            print(f"📊 Accuracy du modèle: {accuracy:.2%}")
+            print("📈 Rapport de classification:")
+            print(classification_report(y_test, y_pred))
         
+        # Mémoriser les features utilisées pour ne calculer qu'elles ensuite
+        self.feature_columns = list(design.columns)
+        self.accuracy = accuracy
+        self._compile()
         self.is_trained = True
         return True
     
@@ -96,13 +224,11 @@ class TradingStrategy:
         """
         Génère les signaux d'achat/vente
         """
-        if not self.is_trained or self.model is None:
+        if not self.is_trained or (self.model is None and self.fast_model is None):
             print("❌ Le modèle n'est pas entraîné")
             return None
         
-        feature_columns = ['rsi', 'sma_20', 'sma_50', 'ema_12', 'ema_26', 'macd', 'macd_signal', 
-                          'macd_hist', 'stoch_k', 'stoch_d', 'williams_r', 'cci', 'adx', 
-                          'returns_1d', 'returns_5d', 'volatility_10d', 'volume_ratio']
+        feature_columns = self.feature_columns or FEATURE_COLUMNS
         
         available_features = [col for col in feature_columns if col in features_df.columns]
         
@@ -119,9 +245,9 @@ class TradingStrategy:
         
         try:
             # Prédiction
-            latest_scaled = self.scaler.transform(latest_data)
-            prediction = self.model.predict(latest_scaled)[0]
-            probability = self.model.predict_proba(latest_scaled)[0]
+            predictions, probabilities = self.predict(latest_data)
+            prediction = predictions[0]
+            probability = probabilities[0]
             
             # Génération du signal
             signal = "ACHAT" if prediction == 1 else "VENTE"
@@ -137,6 +263,60 @@ class TradingStrategy:
             print(f"❌ Erreur lors de la prédiction: {e}")
             return None
     
+    def _compile(self):
+        """
+        Construit la forêt aplatie pour l'inférence rapide (RandomForest uniquement)
+        """
+        if isinstance(self.model, RandomForestClassifier):
+            self.fast_model = FastForest.from_sklearn(self.model, self.scaler)
+        else:
+            self.fast_model = None
+    
+    def update_model(self, features_df):
+        """
+        Apprentissage en ligne : intègre de nouvelles lignes sans réentraîner (backend "sgd")
+        La normalisation est mise à jour avec les mêmes lignes
+        La dernière ligne est ignorée : sa cible (clôture suivante) n'est pas encore connue ; la repasser
+        dans le lot suivant pour l'intégrer
+        """
+        if self.model_backend != 'sgd':
+            print(f"❌ Apprentissage en ligne non disponible pour le backend {self.model_backend}")
+            return False
+        
+        design = self.design_matrix(features_df)
+        if design is None:
+            return False
+        
+        labeled = slice(None, len(design) - 1)
+        X = design.frame(labeled)
+        self.scaler.partial_fit(X)
+        if self.model is None:
+            self.model = build_model(self.model_backend, self.model_params)
+        self.model.partial_fit(self.scaler.transform(X), design.y[labeled], classes=np.array([0, 1], dtype=np.int8))
+        self.feature_columns = list(design.columns)
+        self.is_trained = True
+        return True
+    
+    def predict(self, X):
+        """
+        Retourne (prédictions, probabilités) pour les features brutes X
+        Utilise la forêt aplatie (un seul parcours, normalisation intégrée) quand elle est disponible
+        X peut être une DesignMatrix
+        """
+        if isinstance(X, DesignMatrix):
+            X = X.X if self.fast_model is not None else X.frame()
+        if self.fast_model is not None:
+            return self.fast_model.predict_with_proba(X)
+        # Normalisation faite ici avec les mêmes opérations que StandardScaler.transform :
+        # la validation de sklearn coûte plus cher que le calcul sur une seule ligne
+        X = np.atleast_2d(np.asarray(X))
+        X_scaled = np.array(X, dtype=X.dtype if X.dtype in (np.float32, np.float64) else np.float64)
+        X_scaled -= self.scaler.mean_.astype(X_scaled.dtype)
+        X_scaled /= self.scaler.scale_.astype(X_scaled.dtype)
+        # Une seule passe : la classe prédite est celle de plus forte probabilité (comme model.predict)
+        probabilities = self.model.predict_proba(X_scaled)
+        return self.model.classes_[np.argmax(probabilities, axis=1)], probabilities
+    
     def save_model(self, filename='trading_model.pkl'):
         """
         Sauvegarde le modèle entraîné
@@ -144,7 +324,9 @@ class TradingStrategy:
         if self.is_trained and self.model is not None:
             joblib.dump({
                 'model': self.model,
-                'scaler': self.scaler
+                'scaler': self.scaler,
+                'feature_columns': self.feature_columns,
+                'model_backend': self.model_backend
             }, filename)
             print(f"💾 Modèle sauvegardé sous {filename}")
         else:
@@ -158,9 +340,48 @@ class TradingStrategy:
             loaded = joblib.load(filename)
             self.model = loaded['model']
             self.scaler = loaded['scaler']
+            self.feature_columns = loaded.get('feature_columns')
+            self.model_backend = loaded.get('model_backend', 'random_forest')
+            self._compile()
             self.is_trained = True
             print(f"📂 Modèle chargé depuis {filename}")
             return True
         except Exception as e:
             print(f"❌ Erreur lors du chargement du modèle: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def save_artifact(self, path):
+        """
+        Sauvegarde la forêt aplatie dans un répertoire versionné, rechargeable en mémoire mappée
+        """
+        if self.is_trained and self.fast_model is not None:
+            self.fast_model.save(path, metadata={
+                'feature_columns': self.feature_columns,
+                'accuracy': None if self.accuracy is None else float(self.accuracy),
+                'model_backend': self.model_backend
+            })
+            print(f"💾 Artefact sauvegardé sous {path}")
+        elif self.is_trained:
+            # Rien n'est supprimé : ModelRegistry ignore un artefact plus ancien que le pickle (voir _stale)
+            print(f"⚠️ Artefact disponible uniquement pour le backend random_forest ({self.model_backend})")
+        else:
+            print("❌ Aucun modèle à sauvegarder")
+    
+    def load_artifact(self, path, mmap_mode='r', verbose=True):
+        """
+        Charge un artefact écrit par save_artifact (prédiction seule, sans le modèle sklearn)
+        Avec mmap_mode='r', les tableaux ne sont lus qu'à l'usage et partagés entre processus
+        """
+        try:
+            self.fast_model, meta = FastForest.open(path, mmap_mode=mmap_mode)
+            self.model = None
+            self.model_backend = 'random_forest'
+            self.feature_columns = meta.get('feature_columns')
+            self.accuracy = meta.get('accuracy')
+            self.is_trained = True
+            if verbose:
+                print(f"📂 Artefact chargé depuis {path}")
+            return True
+        except Exception as e:
+            print(f"❌ Erreur lors du chargement de l'artefact: {e}")
+            return False
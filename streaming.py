@@ -0,0 +1,387 @@
+#calcul incrémental des indicateurs (mise à jour O(1) par barre, mêmes valeurs que features.py)
+
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+from indicators import recursive_state
+
+NAN = float('nan')
+
+# Nombre de mises à jour entre deux recalculs exacts des sommes glissantes (limite la dérive)
+RESYNC_EVERY = 1000
+
+# Barres rejouées par from_batch pour remplir les fenêtres glissantes (au moins la plus longue, sma_50)
+WARMUP = 64
+
+
+def _div(a, b):
+    """
+    Division avec la sémantique de pandas (x/0 = ±inf, 0/0 = NaN)
+    """
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _EWM:
+    """
+    Moyenne exponentielle équivalente à Series.ewm(alpha=..., min_periods=..., adjust=False).mean()
+    """
+    __slots__ = ('alpha', 'min_periods', 'value', 'count')
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x):
+        if x == x:
+            if self.count == 0:
+                self.value = x
+            else:
+                self.value = (1 - self.alpha) * self.value + self.alpha * x
+            self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class _RollingMean:
+    """
+    Moyenne (et écart-type) glissante équivalente à Series.rolling(window).mean() / .std(ddof)
+    Les NaN comptent comme valeurs manquantes (résultat NaN tant que la fenêtre n'est pas pleine)
+    """
+    __slots__ = ('window', 'buffer', 'total', 'total_sq', 'nan_count', 'updates')
+
+    def __init__(self, window):
+        self.window = window
+        self.buffer = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self.updates = 0
+
+    def update(self, x):
+        if len(self.buffer) == self.window:
+            old = self.buffer[0]
+            if old != old:
+                self.nan_count -= 1
+            else:
+                self.total -= old
+                self.total_sq -= old * old
+        self.buffer.append(x)
+        if x != x:
+            self.nan_count += 1
+        else:
+            self.total += x
+            self.total_sq += x * x
+
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            valid = [v for v in self.buffer if v == v]
+            self.total = math.fsum(valid)
+            self.total_sq = math.fsum(v * v for v in valid)
+
+    @property
+    def ready(self):
+        return len(self.buffer) == self.window and self.nan_count == 0
+
+    def mean(self):
+        return self.total / self.window if self.ready else NAN
+
+    def std(self, ddof=1):
+        if not self.ready:
+            return NAN
+        # Calcul exact sur la fenêtre (taille fixe, donc coût constant)
+        mean = self.total / self.window
+        var = sum((v - mean) ** 2 for v in self.buffer) / (self.window - ddof)
+        return math.sqrt(var)
+
+
+class _RollingExtremum:
+    """
+    Minimum ou maximum glissant en O(1) amorti (file monotone)
+    """
+    __slots__ = ('window', 'is_max', 'values', 'index')
+
+    def __init__(self, window, is_max):
+        self.window = window
+        self.is_max = is_max
+        self.values = deque()
+        self.index = -1
+
+    def update(self, x):
+        self.index += 1
+        values = self.values
+        while values and values[0][0] <= self.index - self.window:
+            values.popleft()
+        if self.is_max:
+            while values and values[-1][1] <= x:
+                values.pop()
+        else:
+            while values and values[-1][1] >= x:
+                values.pop()
+        values.append((self.index, x))
+        return values[0][1] if self.index >= self.window - 1 else NAN
+
+
+class _WilderSum:
+    """
+    Somme lissée de Wilder telle que calculée par ta.trend.ADXIndicator
+    (somme des window premières valeurs, puis s = s - s / window + x)
+    """
+    __slots__ = ('window', 'value', 'count')
+
+    def __init__(self, window):
+        self.window = window
+        self.value = 0.0
+        self.count = 0
+
+    def update(self, x):
+        self.count += 1
+        if self.count <= self.window:
+            self.value += x
+        else:
+            self.value = self.value - self.value / float(self.window) + x
+        return self.value if self.count >= self.window else NAN
+
+
+class StreamingIndicators:
+    """
+    Version incrémentale de FeatureEngineer.calculate_technical_indicators
+    Chaque nouvelle barre met à jour l'état en temps constant et retourne la ligne de features
+    """
+
+    COLUMNS = ['rsi', 'sma_20', 'sma_50', 'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_hist',
+               'bb_upper', 'bb_lower', 'bb_middle', 'stoch_k', 'stoch_d', 'williams_r', 'cci', 'adx',
+               'returns_1d', 'returns_5d', 'volatility_10d', 'volume_sma', 'volume_ratio']
+
+    def __init__(self):
+        # RSI (14)
+        self.rsi_up = _EWM(1 / 14, 14)
+        self.rsi_down = _EWM(1 / 14, 14)
+        # Moyennes mobiles et MACD (12, 26, 9)
+        self.sma_20 = _RollingMean(20)
+        self.sma_50 = _RollingMean(50)
+        self.ema_12 = _EWM(2 / 13, 12)
+        self.ema_26 = _EWM(2 / 27, 26)
+        self.macd_signal = _EWM(2 / 10, 9)
+        # Stochastique (14, 3) et Williams %R (14)
+        self.low_14 = _RollingExtremum(14, is_max=False)
+        self.high_14 = _RollingExtremum(14, is_max=True)
+        self.stoch_d = _RollingMean(3)
+        # CCI (20)
+        self.typical_price = _RollingMean(20)
+        # ADX (14)
+        self.adx_window = 14
+        self.true_range = _WilderSum(14)
+        self.dm_pos = _WilderSum(14)
+        self.dm_neg = _WilderSum(14)
+        self.dx_history = []
+        self.adx = 0.0
+        # Rendements, volatilité, volume
+        self.closes = deque(maxlen=6)
+        self.volatility = _RollingMean(10)
+        self.volume_sma = _RollingMean(20)
+
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.count = 0
+        self.last_timestamp = None
+        self.last_row = None
+
+    @classmethod
+    def from_history(cls, data):
+        """
+        Initialise l'état à partir d'un historique OHLCV et retourne (moteur, features de l'historique)
+        """
+        engine = cls()
+        features = engine.update_frame(data)
+        return engine, features
+
+    @classmethod
+    def from_batch(cls, data, warmup=WARMUP):
+        """
+        Même état final que from_history, sans rejouer tout l'historique en Python : les récurrences
+        (moyennes exponentielles, sommes de Wilder, ADX) sont reprises d'un calcul vectorisé sur le début
+        de data, puis seules les warmup dernières barres sont rejouées pour remplir les fenêtres glissantes
+        """
+        engine = cls()
+        n = len(data)
+        split = n - warmup
+        if split < warmup:
+            engine.update_frame(data)
+            return engine
+
+        head = data.iloc[:split]
+        high = head['High'].to_numpy(dtype=float)
+        low = head['Low'].to_numpy(dtype=float)
+        close = head['Close'].to_numpy(dtype=float)
+        state = recursive_state(high, low, close, engine.adx_window)
+
+        for name in ('ema_12', 'ema_26'):
+            ewm = getattr(engine, name)
+            ewm.value, ewm.count = float(state[name]), split
+        engine.rsi_up.value, engine.rsi_up.count = float(state['ema_up']), split
+        engine.rsi_down.value, engine.rsi_down.count = float(state['ema_down']), split
+        # Le MACD n'est défini qu'à partir de la 26e barre
+        engine.macd_signal.value, engine.macd_signal.count = float(state['macd_signal']), split - 25
+        # Sommes de Wilder : une mise à jour par barre à partir de la deuxième
+        for name in ('true_range', 'dm_pos', 'dm_neg'):
+            wilder = getattr(engine, name)
+            wilder.value, wilder.count = float(state[name]), split - 1
+        engine.dx_history = None
+        engine.adx = float(state['adx'])
+
+        engine.closes.extend(close[-engine.closes.maxlen:].tolist())
+        engine.prev_high = float(high[-1])
+        engine.prev_low = float(low[-1])
+        engine.count = split
+        engine.update_frame(data.iloc[split:])
+        return engine
+
+    def _update_adx(self, high, low, close, prev_close):
+        """
+        Reproduit ta.trend.ADXIndicator(...).adx() barre par barre
+        """
+        t = self.count
+        w = self.adx_window
+        if t == 0:
+            return 0.0
+
+        true_range = max(high, prev_close) - min(low, prev_close)
+        diff_up = high - self.prev_high
+        diff_down = self.prev_low - low
+        pos = diff_up if (diff_up > diff_down and diff_up > 0) else 0.0
+        neg = diff_down if (diff_down > diff_up and diff_down > 0) else 0.0
+
+        trs = self.true_range.update(true_range)
+        dip = self.dm_pos.update(pos)
+        din = self.dm_neg.update(neg)
+        if t < w:
+            return 0.0
+
+        di_pos = 100 * (dip / trs) if trs != 0 else 0.0
+        di_neg = 100 * (din / trs) if trs != 0 else 0.0
+        dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg)) if di_pos + di_neg != 0 else 0.0
+
+        if t < 2 * w - 1:
+            self.dx_history.append(dx)
+            return 0.0
+        if t == 2 * w - 1:
+            self.dx_history.append(dx)
+            self.adx = float(np.mean(self.dx_history))
+            self.dx_history = None
+        else:
+            self.adx = (self.adx * (w - 1) + dx) / float(w)
+        return self.adx
+
+    def update(self, open_, high, low, close, volume, timestamp=None):
+        """
+        Intègre une barre et retourne le dict des indicateurs pour cette barre
+        """
+        prev_close = self.closes[-1] if self.closes else NAN
+
+        # RSI
+        diff = close - prev_close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        ema_up = self.rsi_up.update(up)
+        ema_down = self.rsi_down.update(down)
+        if ema_down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + _div(ema_up, ema_down)))
+
+        # Moyennes mobiles
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+        sma_20 = self.sma_20.mean()
+        sma_50 = self.sma_50.mean()
+        ema_12 = self.ema_12.update(close)
+        ema_26 = self.ema_26.update(close)
+
+        # MACD
+        macd = ema_12 - ema_26
+        macd_signal = self.macd_signal.update(macd)
+        macd_hist = macd - macd_signal
+
+        # Bollinger Bands (moyenne 20, écart-type population)
+        bb_std = self.sma_20.std(ddof=0)
+        bb_upper = sma_20 + 2 * bb_std
+        bb_lower = sma_20 - 2 * bb_std
+
+        # Stochastique et Williams %R
+        lowest = self.low_14.update(low)
+        highest = self.high_14.update(high)
+        stoch_k = 100 * _div(close - lowest, highest - lowest)
+        self.stoch_d.update(stoch_k)
+        stoch_d = self.stoch_d.mean()
+        williams_r = -100 * _div(highest - close, highest - lowest)
+
+        # CCI
+        tp = (high + low + close) / 3.0
+        self.typical_price.update(tp)
+        if self.typical_price.ready:
+            tp_mean = self.typical_price.mean()
+            window = self.typical_price.buffer
+            raw_mean = sum(window) / len(window)
+            mad = sum(abs(v - raw_mean) for v in window) / len(window)
+            cci = _div(tp - tp_mean, 0.015 * mad)
+        else:
+            cci = NAN
+
+        # ADX
+        adx = self._update_adx(high, low, close, prev_close)
+
+        # Rendements et volatilité
+        returns_1d = _div(close, prev_close) - 1 if prev_close == prev_close else NAN
+        returns_5d = _div(close, self.closes[-5]) - 1 if len(self.closes) >= 5 else NAN
+        self.volatility.update(returns_1d)
+        volatility_10d = self.volatility.std(ddof=1)
+
+        # Volume
+        self.volume_sma.update(volume)
+        volume_sma = self.volume_sma.mean()
+        volume_ratio = _div(volume, volume_sma)
+
+        self.closes.append(close)
+        self.prev_high = high
+        self.prev_low = low
+        self.count += 1
+        self.last_timestamp = timestamp
+
+        self.last_row = {
+            'rsi': rsi, 'sma_20': sma_20, 'sma_50': sma_50, 'ema_12': ema_12, 'ema_26': ema_26,
+            'macd': macd, 'macd_signal': macd_signal, 'macd_hist': macd_hist,
+            'bb_upper': bb_upper, 'bb_lower': bb_lower, 'bb_middle': sma_20,
+            'stoch_k': stoch_k, 'stoch_d': stoch_d, 'williams_r': williams_r, 'cci': cci, 'adx': adx,
+            'returns_1d': returns_1d, 'returns_5d': returns_5d, 'volatility_10d': volatility_10d,
+            'volume_sma': volume_sma, 'volume_ratio': volume_ratio
+        }
+        return self.last_row
+
+    def update_frame(self, data):
+        """
+        Intègre les barres d'un DataFrame OHLCV postérieures à la dernière barre vue
+        Retourne un DataFrame au même format que calculate_technical_indicators (ou None)
+        """
+        if data is None or data.empty:
+            return None
+        if self.last_timestamp is not None:
+            data = data[data.index > self.last_timestamp]
+            if data.empty:
+                return None
+
+        rows = []
+        columns = zip(data.index, data['Open'].to_numpy(dtype=float), data['High'].to_numpy(dtype=float),
+                      data['Low'].to_numpy(dtype=float), data['Close'].to_numpy(dtype=float),
+                      data['Volume'].to_numpy(dtype=float))
+        for timestamp, o, h, l, c, v in columns:
+            row = self.update(float(o), float(h), float(l), float(c), float(v), timestamp)
+            rows.append([row[col] for col in self.COLUMNS])
+
+        features = pd.DataFrame(rows, index=data.index, columns=self.COLUMNS)
+        return pd.concat([data, features], axis=1)
@@ -0,0 +1,169 @@
+#balayage des règles de trading : des milliers de configurations évaluées en un passage sur les mêmes prédictions
+
+import itertools
+import os
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+CONFIG_COLUMNS = ['entry_threshold', 'exit_threshold', 'max_holding', 'stop_loss', 'take_profit']
+
+# Grille utilisée par main.py --sweep (432 configurations)
+DEFAULT_GRID = {
+    'entry_thresholds': (0.55, 0.6, 0.65, 0.7),
+    'exit_thresholds': (0.55, 0.6, 0.65, 0.7),
+    'max_holding': (None, 5, 20),
+    'stop_loss': (None, 0.02, 0.05),
+    'take_profit': (None, 0.05, 0.1)
+}
+
+
+def sweep_configs(entry_thresholds=(0.6,), exit_thresholds=(0.6,), max_holding=(None,), stop_loss=(None,),
+                  take_profit=(None,)):
+    """
+    Produit cartésien des paramètres des règles, un DataFrame avec une ligne par configuration
+    max_holding : nombre maximal de barres en position ; stop_loss / take_profit : seuils relatifs (0.05 = 5 %)
+    None désactive la règle correspondante
+    """
+    rows = itertools.product(entry_thresholds, exit_thresholds, max_holding, stop_loss, take_profit)
+    return pd.DataFrame(list(rows), columns=CONFIG_COLUMNS)
+
+
+def _as_limit(values):
+    """
+    None (règle désactivée) devient +inf pour que la condition ne soit jamais vraie
+    """
+    return np.array([np.inf if v is None or v != v else v for v in values], dtype=np.float64)
+
+
+def _simulate_batch(close, predictions, confidence, configs, initial_capital):
+    """
+    Rejoue toutes les configurations à la fois : une boucle sur les barres, des opérations vectorielles
+    sur l'axe des configurations. Les métriques sont tenues en ligne (Welford pour le Sharpe, maximum courant
+    pour le drawdown), la mémoire ne dépend que du nombre de configurations
+    """
+    entry_threshold = configs['entry_threshold'].to_numpy(dtype=np.float64)
+    exit_threshold = configs['exit_threshold'].to_numpy(dtype=np.float64)
+    max_holding = _as_limit(configs['max_holding'])
+    stop_loss = _as_limit(configs['stop_loss'])
+    take_profit = _as_limit(configs['take_profit'])
+    m = len(configs)
+
+    capital = np.full(m, float(initial_capital))
+    shares = np.zeros(m)
+    entry_price = np.zeros(m)
+    stop_price = np.full(m, -np.inf)
+    take_price = np.full(m, np.inf)
+    entry_bar = np.zeros(m)
+    position = np.zeros(m, dtype=bool)
+    buys = np.zeros(m, dtype=np.int64)
+    sells = np.zeros(m, dtype=np.int64)
+    wins = np.zeros(m, dtype=np.int64)
+    total_pnl = np.zeros(m)
+
+    value = capital.copy()
+    peak = np.zeros(m)
+    max_drawdown = np.zeros(m)
+    mean = np.zeros(m)
+    m2 = np.zeros(m)
+    count = 0
+
+    for i in range(len(close)):
+        price = close[i]
+        strong = confidence[i]
+
+        # Sorties : signal de vente, durée maximale, stop ou objectif atteint
+        exiting = position & ((i - entry_bar >= max_holding) | (price <= stop_price) | (price >= take_price))
+        if predictions[i] == 0:
+            exiting |= position & (strong > exit_threshold)
+        if exiting.any():
+            pnl = (price - entry_price[exiting]) * shares[exiting]
+            capital[exiting] = shares[exiting] * price
+            total_pnl[exiting] += pnl
+            wins[exiting] += pnl > 0
+            sells[exiting] += 1
+            position[exiting] = False
+
+        # Entrées (une seule action par barre : pas de rachat sur la barre d'une sortie)
+        if predictions[i] == 1:
+            entering = ~position & ~exiting & (strong > entry_threshold)
+            if entering.any():
+                shares[entering] = capital[entering] / price
+                entry_price[entering] = price
+                stop_price[entering] = price * (1 - stop_loss[entering])
+                take_price[entering] = price * (1 + take_profit[entering])
+                entry_bar[entering] = i
+                buys[entering] += 1
+                position |= entering
+
+        previous = value
+        value = np.where(position, shares * price, capital)
+
+        # Métriques en ligne
+        if i > 0:
+            count += 1
+            returns = value / previous - 1
+            delta = returns - mean
+            mean += delta / count
+            m2 += delta * (returns - mean)
+        np.maximum(peak, value, out=peak)
+        np.minimum(max_drawdown, (value - peak) / peak, out=max_drawdown)
+
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.zeros(m)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(252), 0.0)
+        avg_pnl = np.where(sells > 0, total_pnl / sells, np.nan)
+        win_rate = np.where(sells > 0, wins / sells, np.nan)
+
+    return pd.DataFrame({
+        'final_value': value,
+        'total_return': (value - initial_capital) / initial_capital,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': max_drawdown,
+        'buy_trades': buys,
+        'sell_trades': sells,
+        'total_pnl': total_pnl,
+        'avg_pnl': avg_pnl,
+        'win_rate': win_rate
+    }, index=configs.index)
+
+
+def parameter_sweep(features_df, strategy, configs=None, initial_capital=10000, n_jobs=None,
+                    sort_by='sharpe_ratio', verbose=True):
+    """
+    Évalue des configurations de règles (voir sweep_configs) sur les prédictions d'une stratégie entraînée
+    Les prédictions sont calculées une seule fois ; les configurations sont réparties entre n_jobs processus
+    Retourne le classement (paramètres + métriques de print_results) trié par sort_by, ou None
+    """
+    if not strategy.is_trained:
+        print("❌ Le modèle n'est pas entraîné")
+        return None
+
+    design = strategy.design_matrix(features_df)
+    if design is None or len(design) < 30:
+        print("❌ Pas assez de données après préparation")
+        return None
+
+    configs = sweep_configs() if configs is None else configs.reset_index(drop=True)
+    predictions, probabilities = strategy.predict(design)
+    close = np.asarray(design.close, dtype=np.float64)
+    confidence = probabilities.max(axis=1)
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(configs))
+    chunks = np.array_split(np.arange(len(configs)), n_jobs)
+    start = time.perf_counter()
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(_simulate_batch)(close, predictions, confidence, configs.iloc[chunk], initial_capital)
+        for chunk in chunks if len(chunk)
+    )
+    elapsed = time.perf_counter() - start
+
+    results = pd.concat([configs, pd.concat(parts)], axis=1)
+    results = results.sort_values(sort_by, ascending=False).reset_index(drop=True)
+    results.attrs['elapsed'] = elapsed
+
+    if verbose:
+        print(f"🧪 {len(configs)} configurations sur {len(design)} barres en {elapsed:.1f}s ({n_jobs} processus)")
+        print(results.head(10).to_string(index=False))
+    return results
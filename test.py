@@ -18,4 +18,19 @@ try:
     print(f"✅ Features calculées: {len(features.columns)} indicateurs")
     
 except Exception as e:
-    print(f"❌ Erreur: {e}")
\ No newline at end of file
+    print(f"❌ Erreur: {e}")
+
+# Parité des backends d'indicateurs (hors ligne, données synthétiques)
+try:
+    from indicators import check_parity
+    from benchmarks._synthetic import synthetic_ohlcv
+    
+    parity = check_parity(synthetic_ohlcv(2000))
+    if parity['ok'].all():
+        print(f"✅ Parité ta/numpy: écart relatif max {parity['max_rel_error'].max():.1e}")
+    else:
+        print("❌ Écarts entre les backends ta et numpy:")
+        print(parity[~parity['ok']])
+    
+except Exception as e:
+    print(f"❌ Erreur: {e}")
@@ -0,0 +1,160 @@
+#recherche d'hyperparamètres du RandomForest : grille ou tirage aléatoire, arrêt anticipé par divisions successives
+
+import math
+import os
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import accuracy_score
+from strategy import TradingStrategy, MODEL_PARAMS
+from fastforest import FastForest
+
+# Espace de recherche par défaut (les autres paramètres viennent de MODEL_PARAMS)
+PARAM_SPACE = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [5, 10, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', 0.5]
+}
+
+# Taille minimale du train d'un essai au premier palier
+MIN_TRAIN_ROWS = 50
+
+# Part finale du train réservée à la validation (classement des essais) ; le test ne sert qu'au rapport final
+VALIDATION_FRACTION = 0.2
+
+
+def _evaluate(X_fit, y_fit, X_val, y_val, params, rows):
+    """
+    Entraîne un essai sur les rows dernières lignes du train et retourne (accuracy de validation, durée)
+    Exécuté dans un worker joblib : les matrices, déjà normalisées, sont en lecture seule
+    """
+    start = time.perf_counter()
+    model = RandomForestClassifier(**dict(MODEL_PARAMS, **params))
+    model.fit(X_fit[-rows:], y_fit[-rows:])
+    accuracy = accuracy_score(y_val, model.predict(X_val))
+    return accuracy, time.perf_counter() - start
+
+
+def _rungs(n_train, eta, min_fraction):
+    """
+    Nombre de lignes de train de chaque palier : n_train / eta^k, du plus petit au train complet
+    """
+    rows = []
+    size = n_train
+    while size >= max(MIN_TRAIN_ROWS, n_train * min_fraction):
+        rows.append(size)
+        size = int(size / eta)
+    return rows[::-1] or [n_train]
+
+
+def search_hyperparameters(features_df, method="random", param_space=None, n_trials=20, eta=3,
+                           min_fraction=1 / 9, time_budget=None, n_jobs=None, memory_policy="float64",
+                           feature_columns=None, save_path=None, random_state=42, verbose=True):
+    """
+    Recherche les meilleurs paramètres du RandomForest sur le même split 80/20 que TradingStrategy
+    Les essais sont classés sur la fin du train (VALIDATION_FRACTION) ; le test n'évalue que le modèle retenu
+    method : "grid" (toutes les combinaisons) ou "random" (n_trials tirages)
+    Arrêt anticipé : chaque palier entraîne sur plus de lignes récentes et ne garde que le meilleur 1/eta
+    time_budget : durée maximale en secondes (les essais restants ne sont pas lancés)
+    save_path : sauvegarde du meilleur modèle, réentraîné sur tout le train
+    Retourne (classement, TradingStrategy entraînée avec les meilleurs paramètres) ou (None, None)
+    """
+    if method not in ("grid", "random"):
+        print(f"❌ Méthode de recherche inconnue: {method}")
+        return None, None
+
+    # Matrice préparée et normalisée une seule fois pour tous les essais
+    strategy = TradingStrategy(memory_policy=memory_policy, feature_columns=feature_columns)
+    design = strategy.design_matrix(features_df)
+    if design is None or len(design) < 50:
+        print("❌ Pas assez de données pour la recherche d'hyperparamètres")
+        return None, None
+
+    n_train = len(design) - math.ceil(0.2 * len(design))
+    n_fit = n_train - math.ceil(VALIDATION_FRACTION * n_train)
+    val_scaler = StandardScaler()
+    X_fit_scaled = np.ascontiguousarray(val_scaler.fit_transform(design.frame(slice(None, n_fit))))
+    X_val_scaled = np.ascontiguousarray(val_scaler.transform(design.frame(slice(n_fit, n_train))))
+    y_fit = design.y[:n_fit]
+    y_val = design.y[n_fit:n_train]
+
+    space = param_space or PARAM_SPACE
+    if method == "grid":
+        candidates = list(ParameterGrid(space))
+    else:
+        candidates = list(ParameterSampler(space, n_iter=n_trials, random_state=random_state))
+
+    rungs = _rungs(len(X_fit_scaled), eta, min_fraction)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    rows = [{'trial': i, **params, 'val_accuracy': np.nan, 'train_rows': 0, 'rung': -1, 'fit_time': 0.0}
+            for i, params in enumerate(candidates)]
+
+    start = time.perf_counter()
+    alive = list(range(len(candidates)))
+    out_of_time = False
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rung, train_rows in enumerate(rungs):
+            # Lots de n_jobs essais pour pouvoir s'arrêter dès que le budget est épuisé
+            for batch_start in range(0, len(alive), n_jobs):
+                if time_budget is not None and time.perf_counter() - start > time_budget:
+                    out_of_time = True
+                    break
+                batch = alive[batch_start:batch_start + n_jobs]
+                results = parallel(
+                    delayed(_evaluate)(X_fit_scaled, y_fit, X_val_scaled, y_val, candidates[i], train_rows)
+                    for i in batch
+                )
+                for i, (accuracy, fit_time) in zip(batch, results):
+                    rows[i].update(val_accuracy=accuracy, train_rows=train_rows, rung=rung)
+                    rows[i]['fit_time'] += fit_time
+
+            evaluated = [i for i in alive if rows[i]['rung'] == rung]
+            if out_of_time or rung == len(rungs) - 1:
+                break
+            keep = max(1, math.ceil(len(evaluated) / eta))
+            alive = sorted(evaluated, key=lambda i: rows[i]['val_accuracy'], reverse=True)[:keep]
+    elapsed = time.perf_counter() - start
+
+    # Classement : palier atteint puis accuracy de validation (à palier égal, même quantité de données)
+    leaderboard = pd.DataFrame(rows).sort_values(['rung', 'val_accuracy'], ascending=False).reset_index(drop=True)
+    leaderboard.attrs['elapsed'] = elapsed
+    if leaderboard['rung'].max() < 0:
+        print("❌ Aucun essai terminé dans le budget de temps")
+        return leaderboard, None
+
+    # Modèle retenu réentraîné sur tout le train (entraînement + validation), évalué une seule fois sur le test
+    scaler = StandardScaler()
+    X_train_scaled = np.ascontiguousarray(scaler.fit_transform(design.frame(slice(None, n_train))))
+    X_test_scaled = np.ascontiguousarray(scaler.transform(design.frame(slice(n_train, None))))
+    y_train = design.y[:n_train]
+    y_test = design.y[n_train:]
+
+    best = candidates[int(leaderboard.loc[0, 'trial'])]
+    best_strategy = TradingStrategy(memory_policy=memory_policy, feature_columns=design.columns,
+                                    model_params=best)
+    best_strategy.model = RandomForestClassifier(**best_strategy.model_params)
+    best_strategy.model.fit(X_train_scaled, y_train)
+    best_strategy.scaler = scaler
+    best_strategy.accuracy = accuracy_score(y_test, best_strategy.model.predict(X_test_scaled))
+    leaderboard.attrs['test_accuracy'] = best_strategy.accuracy
+    best_strategy.fast_model = FastForest.from_sklearn(best_strategy.model, scaler)
+    best_strategy.is_trained = True
+
+    if verbose:
+        status = " (budget de temps atteint)" if out_of_time else ""
+        print(f"🔎 Recherche {method}: {len(candidates)} essais, {len(rungs)} paliers, "
+              f"{elapsed:.1f}s sur {n_jobs} processus{status}")
+        columns = ['trial'] + list(space) + ['val_accuracy', 'train_rows']
+        print(leaderboard[columns].head(10).to_string(index=False))
+        print(f"🏆 Meilleurs paramètres: {best} → accuracy validation {leaderboard.loc[0, 'val_accuracy']:.2%}, "
+              f"test {best_strategy.accuracy:.2%}")
+
+    if save_path:
+        best_strategy.save_model(save_path)
+    return leaderboard, best_strategy
@@ -0,0 +1,112 @@
+#validation walk-forward : réentraînements successifs sur fenêtres croissantes ou glissantes, folds en parallèle
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import accuracy_score, precision_score, recall_score
+from strategy import TradingStrategy, build_model
+
+
+def walk_forward_splits(n_samples, train_size, test_size, step=None, mode="expanding"):
+    """
+    Bornes (début_train, fin_train, fin_test) de chaque fold, dans l'ordre chronologique
+    mode "expanding" : le train commence toujours à la première ligne
+    mode "rolling" : le train garde train_size lignes
+    step : décalage entre deux folds (défaut test_size : périodes de test sans recouvrement)
+    """
+    if mode not in ("expanding", "rolling"):
+        raise ValueError(f"Mode walk-forward inconnu: {mode}")
+    step = step or test_size
+
+    splits = []
+    train_end = train_size
+    while train_end < n_samples:
+        train_start = 0 if mode == "expanding" else train_end - train_size
+        splits.append((train_start, train_end, min(train_end + test_size, n_samples)))
+        train_end += step
+    return splits
+
+
+def _run_fold(X, y, bounds, model_backend, model_params):
+    """
+    Entraîne et évalue un fold (exécuté dans un worker joblib, X et y en lecture seule)
+    """
+    train_start, train_end, test_end = bounds
+
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_start:train_end])
+    model = build_model(model_backend, model_params)
+    model.fit(X_train, y[train_start:train_end])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_test = y[train_end:test_end]
+    y_pred = model.predict(scaler.transform(X[train_end:test_end]))
+    predict_time = time.perf_counter() - start
+
+    return {
+        'train_rows': train_end - train_start,
+        'test_rows': test_end - train_end,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, zero_division=0),
+        'recall': recall_score(y_test, y_pred, zero_division=0),
+        'up_rate': float(np.mean(y_test)),
+        'fit_time': fit_time,
+        'predict_time': predict_time
+    }
+
+
+def walk_forward(features_df, train_size=252, test_size=63, step=None, mode="expanding", n_jobs=None,
+                 memory_policy="float64", feature_columns=None, model_params=None, model_backend="random_forest",
+                 verbose=True):
+    """
+    Évalue la stratégie par walk-forward : un modèle par fold, testé sur la période qui suit son train
+    La matrice de features est préparée une seule fois et partagée par tous les folds
+    n_jobs : nombre de processus (défaut : tous les cœurs)
+    model_backend, model_params : modèle de chaque fold (voir strategy.MODEL_BACKENDS)
+    Retourne un DataFrame (une ligne par fold : bornes, métriques, durées) ou None
+    """
+    strategy = TradingStrategy(memory_policy=memory_policy, feature_columns=feature_columns,
+                               model_params=model_params, model_backend=model_backend)
+    design = strategy.design_matrix(features_df)
+    if design is None:
+        return None
+
+    splits = walk_forward_splits(len(design), train_size, test_size, step, mode)
+    if not splits:
+        print(f"❌ Pas assez de données pour un fold walk-forward ({len(design)} lignes, train de {train_size})")
+        return None
+
+    # Tableaux contigus : joblib les transmet aux workers en memmap lecture seule au lieu de les copier
+    X_values = design.X
+    y_values = design.y
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(splits))
+
+    start = time.perf_counter()
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_run_fold)(X_values, y_values, bounds, model_backend, strategy.model_params)
+        for bounds in splits
+    )
+    elapsed = time.perf_counter() - start
+
+    index = design.index
+    report = pd.DataFrame(rows)
+    report.insert(0, 'fold', range(len(splits)))
+    report.insert(1, 'train_start', [index[s] for s, _, _ in splits])
+    report.insert(2, 'test_start', [index[e] for _, e, _ in splits])
+    report.insert(3, 'test_end', [index[t - 1] for _, _, t in splits])
+    report.attrs['elapsed'] = elapsed
+    report.attrs['n_jobs'] = n_jobs
+
+    if verbose:
+        print(f"📊 Walk-forward ({mode}): {len(report)} folds en {elapsed:.1f}s sur {n_jobs} processus")
+        for row in report.itertuples():
+            print(f"   Fold {row.fold:>3} | test {row.test_start:%Y-%m-%d} → {row.test_end:%Y-%m-%d} "
+                  f"| accuracy {row.accuracy:.2%} | entraînement {row.fit_time:.2f}s")
+        print(f"✅ Accuracy moyenne: {report['accuracy'].mean():.2%} (écart-type {report['accuracy'].std():.2%})")
+
+    return report